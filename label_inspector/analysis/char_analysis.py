@@ -7,6 +7,16 @@ from .analysis_framework import AnalysisBase, analysis_object, field
 
 if TYPE_CHECKING:
     from .grapheme_analysis import GraphemeAnalysis
+    from label_inspector.components.features import Features
+
+
+def char_type(f: Features, char: str, grapheme: str) -> str:
+    '''
+    Type of a char of the grapheme, ZWJs in emoji sequences are emoji.
+    '''
+    if (char == '\u200d' and myunicode.is_emoji(grapheme)) or myunicode.is_emoji_char(char):
+        return 'emoji'
+    return f.type(char)
 
 
 @analysis_object
@@ -43,11 +53,7 @@ class CharAnalysis(AnalysisBase):
     @field
     def type(self) -> str:
         # Refers to this char's parent grapheme to detect ZWJs in emoji sequences.
-        if ((self._char == '\u200d' and myunicode.is_emoji(self.parent_grapheme.value))
-                or myunicode.is_emoji_char(self._char)):
-            return 'emoji'
-        else:
-            return self.root.i.f.type(self._char)
+        return char_type(self.root.i.f, self._char, self.parent_grapheme.value)
 
     @field
     def unicode_version(self) -> Optional[str]:
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from label_inspector.common import myunicode
+from .grapheme_analysis import grapheme_script
+from .label_analysis import ScriptAggregator
+
+if TYPE_CHECKING:
+    from label_inspector.inspector import Inspector
+
+
+# score added for every confusable grapheme
+CONFUSABLE_WEIGHT = 1
+# additional score for a confusable grapheme without a canonical
+NO_CANONICAL_WEIGHT = 1
+# score added once if the label mixes scripts (`all_script` is `null`)
+MIXED_SCRIPT_WEIGHT = 2
+
+
+class ConfusableRiskResult(NamedTuple):
+    score: int
+    confusable_count: int
+    canonical_exists: bool
+    mixed_script: bool
+    exceeded: bool
+
+
+def confusable_risk(inspector: Inspector,
+                    label: str,
+                    threshold: Optional[int] = None,
+                    simple: bool = False) -> ConfusableRiskResult:
+    '''
+    Computes a confusability score of the label without building the full analysis.
+    The score consists of:
+    * `CONFUSABLE_WEIGHT` for every confusable grapheme
+    * `NO_CANONICAL_WEIGHT` for every confusable grapheme without a canonical
+    * `MIXED_SCRIPT_WEIGHT` if the label has many scripts (same rules as `all_script`)
+    If `threshold` is given, the computation stops as soon as the score exceeds it.
+    In that case `exceeded` is set and the other fields are lower bounds.
+    '''
+    f = inspector.f
+    score = 0
+    confusable_count = 0
+    canonical_exists = True
+    mixed_script = False
+    scripts = ScriptAggregator()
+
+    for grapheme in myunicode.grapheme.split(label):
+        if not mixed_script and scripts.add(grapheme_script(grapheme)):
+            mixed_script = True
+            score += MIXED_SCRIPT_WEIGHT
+
+        if f.is_confusable(grapheme, simple=simple):
+            confusable_count += 1
+            score += CONFUSABLE_WEIGHT
+            if f.get_canonical(grapheme, simple=simple) is None:
+                canonical_exists = False
+                score += NO_CANONICAL_WEIGHT
+
+        if threshold is not None and score > threshold:
+            return ConfusableRiskResult(score, confusable_count, canonical_exists, mixed_script, exceeded=True)
+
+    return ConfusableRiskResult(score, confusable_count, canonical_exists, mixed_script, exceeded=False)
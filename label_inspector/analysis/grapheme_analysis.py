@@ -1,20 +1,56 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Dict, TYPE_CHECKING
 
 from label_inspector.common import myunicode
-from label_inspector.components.font_support import aggregate_font_support
 
 from .analysis_framework import AnalysisBase, analysis_object, field, agg_only, agg_all
-from .char_analysis import CharAnalysis
+from .char_analysis import CharAnalysis, char_type
 
 if TYPE_CHECKING:
     from .label_analysis import LabelAnalysis
+    from label_inspector.components.features import Features
+    from label_inspector.components.font_support import FontSupport
 
 
 def v2num(version: str) -> int:
     return [int(x) for x in version.split('.')]
 
 
+def is_emoji_grapheme(grapheme: str) -> bool:
+    '''
+    Whether the type of the grapheme is `emoji`, an emoji sequence or emoji chars only (see `CharAnalysis.type`).
+    '''
+    if grapheme == '\ufe0f':  # because it is treated as emoji
+        return False
+    return myunicode.is_emoji(grapheme) or all(map(myunicode.is_emoji_char, grapheme))
+
+
+def grapheme_type(f: Features, grapheme: str) -> str:
+    '''
+    Type of the grapheme, the type of all its chars or `special`.
+    '''
+    if grapheme == '\ufe0f':  # because it is treated as emoji
+        return 'invisible'
+    if is_emoji_grapheme(grapheme):
+        return 'emoji'
+    return agg_all([char_type(f, char, grapheme) for char in grapheme]) or 'special'
+
+
+def grapheme_script(grapheme: str) -> str:
+    scr = myunicode.script_of(grapheme)
+    return scr if scr is not None else 'Combined'
+
+
+def grapheme_font_support_mask(font_support: FontSupport, grapheme: str) -> int:
+    '''
+    Font support of the grapheme on all platforms (see FontSupport).
+    '''
+    if is_emoji_grapheme(grapheme):
+        return font_support.support_mask(grapheme)
+    else:
+        return font_support.aggregate_masks(font_support.support_masks_many(grapheme))
+
+
 @analysis_object
 class GraphemeAnalysis(AnalysisBase):
     '''
@@ -74,27 +110,32 @@ class GraphemeAnalysis(AnalysisBase):
 
     @field
     def script(self) -> str:
-        scr = myunicode.script_of(self.grapheme)
-        return scr if scr is not None else 'Combined'
+        return grapheme_script(self.grapheme)
 
     @field
     def type(self) -> str:
-        if self.grapheme == '\ufe0f':  # because it is treated as emoji
-            return 'invisible'
-            
-        if myunicode.is_emoji(self.grapheme):
-            return 'emoji'
-
-        cls = agg_all([c.type for c in self._chars_untruncated])
+        return grapheme_type(self.root.i.f, self.grapheme)
 
-        return cls or 'special'
+    @field
+    def _font_support_mask(self) -> int:
+        """
+        Font support on all platforms (see FontSupport).
+        """
+        return grapheme_font_support_mask(self.root.i.f.font_support, self.grapheme)
 
     @field
     def font_support_all_os(self) -> Optional[bool]:
-        if self.type == 'emoji':
-            return self.root.i.f.font_support.check_support(self.grapheme)
-        else:
-            return aggregate_font_support([self.root.i.f.font_support.check_support(c) for c in self.grapheme])
+        return self.root.i.f.font_support.all_os_level(self._font_support_mask)
+
+    @field
+    def font_support_by_os(self) -> Optional[Dict[str, Optional[bool]]]:
+        """
+        `None` (omitted) if there are no font datasets of individual platforms.
+        """
+        font_support = self.root.i.f.font_support
+        if not font_support.individual_platforms:
+            return None
+        return font_support.levels_by_os(self._font_support_mask)
 
     @field
     def description(self) -> str:
@@ -1,21 +1,24 @@
 from __future__ import annotations
-from typing import List, Dict, Optional, Iterable, TYPE_CHECKING
+from typing import Callable, List, Dict, Optional, Iterable, TypeVar, TYPE_CHECKING
 
-from ens_normalize import ens_normalize, ens_beautify, ens_cure, ens_process, ENSProcessResult, DisallowedSequence, CurableSequence
+from ens_normalize import ENSProcessResult, CurableSequence
 
 from .analysis_framework import AnalysisBase, analysis_object, field, agg_all, agg_any
-from .grapheme_analysis import GraphemeAnalysis
+from .grapheme_analysis import GraphemeAnalysis, grapheme_type, grapheme_script, grapheme_font_support_mask
 from .grapheme_with_confusables_analysis import GraphemeWithConfusablesAnalysis
 from .char_analysis import CharAnalysis
+from .normalization import cached_ens_process, any_error, cure, CureResult, CureStatus
 
 from label_inspector.common.punycode import puny_analysis, PunycodeAnalysisResult
 from label_inspector.common import myunicode
-from label_inspector.components.font_support import aggregate_font_support
 
 if TYPE_CHECKING:
     from label_inspector.inspector import Inspector
 
 
+T = TypeVar('T')
+
+
 def count_words(tokenizeds: List[Dict]) -> int:
     count = [len(tokenized['tokens']) for tokenized in tokenizeds if '' not in tokenized['tokens']]
     if not count:
@@ -24,6 +27,59 @@ def count_words(tokenizeds: List[Dict]) -> int:
         return min(count)
 
 
+class ScriptAggregator:
+    """
+    Aggregates scripts of graphemes one by one, like `aggregate_scripts`.
+    `mixed` is set as soon as the graphemes cannot have a common script.
+    """
+
+    def __init__(self):
+        self.mixed = False
+        self.strong_script = None
+        self.had_inherited = False
+        self.had_common = False
+
+    def add(self, script: str) -> bool:
+        """
+        Adds the script of the next grapheme, returns whether the scripts are mixed.
+        """
+        if self.mixed:
+            return True
+        if script in ('Unknown', 'Combined'):
+            # handles case 1
+            self.mixed = True
+        elif script == 'Inherited':
+            self.had_inherited = True
+        elif script == 'Common':
+            self.had_common = True
+        elif self.strong_script is None:
+            self.strong_script = script
+        elif self.strong_script != script:
+            # handles case 4
+            self.mixed = True
+        return self.mixed
+
+    def result(self) -> Optional[str]:
+        if self.mixed:
+            return None
+        # handles cases 2 and 3
+        return (self.strong_script
+                or ('Common' if self.had_common else None)
+                or ('Inherited' if self.had_inherited else None))
+
+
+def aggregate_scripts(scripts: Iterable[str]) -> Optional[str]:
+    """
+    Returns the script of all graphemes given their scripts (see `all_script` in the response model).
+    Returns None if any script is Unknown/Combined or if there are many non-neutral scripts.
+    """
+    aggregator = ScriptAggregator()
+    for script in scripts:
+        if aggregator.add(script):
+            break
+    return aggregator.result()
+
+
 class LabelAnalysisConfig:
     def __init__(self,
                  label: str,
@@ -31,8 +87,11 @@ class LabelAnalysisConfig:
                  truncate_graphemes: int = None,
                  truncate_chars: int = None,
                  simple_confusables: bool = False,
-                 long_label: int = 30,
+                 long_label: int = None,
                  omit_cure: bool = False,
+                 cure_max_iterations: int = None,
+                 cure_timeout: float = None,
+                 long_label_graphemes: int = None,
                  ):
         self.label = label
         self.truncate_confusables = truncate_confusables
@@ -41,6 +100,10 @@ class LabelAnalysisConfig:
         self.simple_confusables = simple_confusables
         self.long_label = long_label
         self.omit_cure = omit_cure
+        self.cure_max_iterations = cure_max_iterations
+        self.cure_timeout = cure_timeout
+        # labels with more chars or graphemes are analysed in the summary tier
+        self.long_label_graphemes = long_label_graphemes
 
 
 @analysis_object
@@ -58,6 +121,18 @@ class LabelAnalysis(AnalysisBase):
     def is_response_model_unnormalized(self) -> bool:
         return not self.is_normalized
 
+    def is_summary_tier(self) -> bool:
+        return self.analysis_tier == 'summary'
+
+    def _grapheme_values(self, name: str, compute: Callable[[str], T]) -> List[T]:
+        """
+        Values of a grapheme analysis field for all graphemes.
+        In the summary tier they are computed from the graphemes, without building grapheme and char analyses.
+        """
+        if self.is_summary_tier():
+            return [compute(grapheme) for grapheme in self._raw_graphemes]
+        return [getattr(grapheme, name) for grapheme in self._graphemes_untruncated]
+
     # no need for cached @field, because it just returns a generator
     @property
     def _chars_untruncated(self) -> Iterable[CharAnalysis]:
@@ -81,18 +156,20 @@ class LabelAnalysis(AnalysisBase):
     @field
     def _ens_process_result(self) -> ENSProcessResult:
         """
-        Result of myunicode.ens_process.
+        Result of ens_process, shared with other analyses of the same label.
         """
-        return ens_process(
-            self.config.label,
-            do_normalize=True,
-            do_beautify=True,
-            do_normalizations=True,
-        )
+        return cached_ens_process(self.config.label)
+
+    @field
+    def _canonical_ens_process_result(self) -> Optional[ENSProcessResult]:
+        canonical_label = self.canonical_label
+        if canonical_label is None:
+            return None
+        return cached_ens_process(canonical_label)
 
     @property
     def _ens_process_any_error(self):
-        return self._ens_process_result.error or (self._ens_process_result.normalizations[0] if self._ens_process_result.normalizations else None)
+        return any_error(self._ens_process_result)
 
     @property
     def _ens_error_is_curable(self):
@@ -117,6 +194,18 @@ class LabelAnalysis(AnalysisBase):
         else:
             return 'unnormalized'
 
+    @field
+    def analysis_tier(self) -> str:
+        """
+        `summary` for long labels (see `long_label` and `long_label_graphemes`),
+        which are analysed without the per-grapheme trees, otherwise `full`.
+        """
+        if self.config.long_label is not None and self.char_length > self.config.long_label:
+            return 'summary'
+        if self.config.long_label_graphemes is not None and self.grapheme_length > self.config.long_label_graphemes:
+            return 'summary'
+        return 'full'
+
     @field
     def char_length(self) -> Optional[int]:
         return len(self.config.label)
@@ -136,49 +225,42 @@ class LabelAnalysis(AnalysisBase):
     @field
     def graphemes(self) -> Optional[List[GraphemeWithConfusablesAnalysis]]:
         """
-        Truncated grapheme analysis.
+        Truncated grapheme analysis, empty in the summary tier.
         """
+        if self.is_summary_tier():
+            return []
         return self._graphemes_untruncated[:self.config.truncate_graphemes]
 
     # Aggregates (using untruncated grapheme analysis)
 
+    @field
+    def _grapheme_types(self) -> List[str]:
+        return self._grapheme_values('type', lambda g: grapheme_type(self.i.f, g))
+
+    @field
+    def _grapheme_confusable(self) -> List[bool]:
+        simple = self.config.simple_confusables
+        return self._grapheme_values('_is_confusable', lambda g: self.i.f.is_confusable(g, simple=simple))
+
     @field
     def all_type(self) -> Optional[str]:
-        return agg_all([g.type for g in self._graphemes_untruncated])
+        return agg_all(self._grapheme_types)
 
     @field
     def any_types(self) -> Optional[List[str]]:
-        return agg_any([g.type for g in self._graphemes_untruncated])
+        return agg_any(self._grapheme_types)
 
     @field
     def all_script(self) -> Optional[str]:
-        scripts = self.any_scripts
-        had_inherited = False
-        had_common = False
-        strong_script = None
-        for script in scripts:
-            if script in ('Unknown', 'Combined'):
-                # handles case 1
-                return None
-            elif script == 'Inherited':
-                had_inherited = True
-            elif script == 'Common':
-                had_common = True
-            elif strong_script is None:
-                strong_script = script
-            elif strong_script != script:
-                # handles case 4
-                return None
-        # handles cases 2 and 3
-        return strong_script or ('Common' if had_common else None) or ('Inherited' if had_inherited else None)
+        return aggregate_scripts(self.any_scripts)
 
     @field
     def any_scripts(self) -> Optional[List[str]]:
-        return agg_any([g.script for g in self._graphemes_untruncated])
+        return agg_any(self._grapheme_values('script', grapheme_script))
 
     @field
     def confusable_count(self) -> int:
-        return sum([1 for g in self._graphemes_untruncated if g._is_confusable])
+        return sum(self._grapheme_confusable)
 
     @field
     def dns_hostname_support(self) -> Optional[bool]:
@@ -194,14 +276,16 @@ class LabelAnalysis(AnalysisBase):
 
     @field
     def canonical_label(self) -> Optional[str]:
+        simple = self.config.simple_confusables
         canonicals = []
-        for grapheme in self._graphemes_untruncated:
-            if not grapheme._is_confusable:
-                canonicals.append(grapheme.value)
-            elif grapheme.confusables_canonical is None:
+        for grapheme, confusable in zip(self._raw_graphemes, self._grapheme_confusable):
+            if not confusable:
+                canonicals.append(grapheme)
+                continue
+            canonical = self.i.f.get_canonical(grapheme, simple=simple)
+            if canonical is None:
                 return None
-            else:
-                canonicals.append(grapheme.confusables_canonical.value)
+            canonicals.append(canonical)
         return ''.join(canonicals)
 
     @field
@@ -214,13 +298,8 @@ class LabelAnalysis(AnalysisBase):
         * at least one confusable does not have a canonical
         * result cannot be normalized
         """
-        canonical_label = self.canonical_label
-        if canonical_label is None:
-            return None
-        try:
-            return ens_normalize(canonical_label)
-        except DisallowedSequence:
-            return None
+        result = self._canonical_ens_process_result
+        return None if result is None else result.normalized
 
     @field
     def beautiful_canonical_label(self) -> Optional[str]:
@@ -228,17 +307,28 @@ class LabelAnalysis(AnalysisBase):
         ENSIP beautified `canonical_confusable_label`.
         Is `null` if `canonical_confusable_label` is `null`.
         """
-        canonical_label = self.canonical_label
-        if canonical_label is None:
-            return None
-        try:
-            return ens_beautify(canonical_label)
-        except DisallowedSequence:
-            return None
+        result = self._canonical_ens_process_result
+        return None if result is None else result.beautified
+
+    @field
+    def _font_support_mask(self) -> int:
+        font_support = self.i.f.font_support
+        return font_support.aggregate_masks(
+            self._grapheme_values('_font_support_mask', lambda g: grapheme_font_support_mask(font_support, g)))
 
     @field
     def font_support_all_os(self) -> Optional[bool]:
-        return aggregate_font_support([g.font_support_all_os for g in self._graphemes_untruncated])
+        return self.i.f.font_support.all_os_level(self._font_support_mask)
+
+    @field
+    def font_support_by_os(self) -> Optional[Dict[str, Optional[bool]]]:
+        """
+        `None` (omitted) if there are no font datasets of individual platforms.
+        """
+        font_support = self.i.f.font_support
+        if not font_support.individual_platforms:
+            return None
+        return font_support.levels_by_os(self._font_support_mask)
 
     # \ COMMON
 
@@ -261,13 +351,24 @@ class LabelAnalysis(AnalysisBase):
         if self.is_response_model_unnormalized():
             return self._ens_process_result.normalized
 
+    @field
+    def _cure_result(self) -> CureResult:
+        if self.config.omit_cure:
+            return CureResult(None, CureStatus.OMITTED, 0)
+        return cure(self.label,
+                    max_iterations=self.config.cure_max_iterations,
+                    timeout=self.config.cure_timeout,
+                    result=self._ens_process_result)
+
     @field
     def cured_label(self) -> Optional[str]:
-        if self.is_response_model_unnormalized() and not self.config.omit_cure:
-            try:
-                return ens_cure(self.label)
-            except DisallowedSequence:
-                return None
+        if self.is_response_model_unnormalized():
+            return self._cure_result.cured
+
+    @field
+    def cure_status(self) -> Optional[str]:
+        if self.is_response_model_unnormalized():
+            return self._cure_result.status.name
 
     @field
     def normalization_error_message(self) -> Optional[str]:
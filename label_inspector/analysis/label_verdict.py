@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from label_inspector.common import myunicode
+from .grapheme_analysis import grapheme_font_support_mask, grapheme_script
+from .label_analysis import aggregate_scripts
+from .normalization import cached_ens_process, any_error
+
+if TYPE_CHECKING:
+    from label_inspector.inspector import Inspector
+
+
+class LabelVerdict(NamedTuple):
+    safe: bool
+    normalized: bool
+    confusable_count: int
+    single_script: bool
+    font_support_all_os: Optional[bool]
+
+
+def label_verdict(inspector: Inspector, label: str, simple: bool = False) -> LabelVerdict:
+    '''
+    Computes the fields of the full analysis clients most often check, without building grapheme and char analyses:
+    * `normalized` - `status` is `normalized`
+    * `confusable_count` - same as in the full analysis
+    * `single_script` - `all_script` is not `null`
+    * `font_support_all_os` - same as in the full analysis
+    The label is `safe` if it is normalized, has no confusables, has a single script
+    and is not known to be unsupported by fonts.
+    '''
+    f = inspector.f
+    font_support = f.font_support
+
+    normalized = any_error(cached_ens_process(label)) is None
+
+    confusable_count = 0
+    scripts = set()
+    masks = []
+    for grapheme in myunicode.grapheme.split(label):
+        scripts.add(grapheme_script(grapheme))
+        if f.is_confusable(grapheme, simple=simple):
+            confusable_count += 1
+        masks.append(grapheme_font_support_mask(font_support, grapheme))
+
+    single_script = aggregate_scripts(scripts) is not None
+    font_support_all_os = font_support.all_os_level(font_support.aggregate_masks(masks))
+    safe = normalized and confusable_count == 0 and single_script and font_support_all_os is not False
+    return LabelVerdict(safe, normalized, confusable_count, single_script, font_support_all_os)
@@ -0,0 +1,122 @@
+from typing import NamedTuple, Optional, Union
+from collections import OrderedDict
+from enum import Enum, auto
+from functools import lru_cache
+import threading
+import time
+
+from ens_normalize import ens_process, ENSProcessResult, CurableSequence, DisallowedSequence, NormalizableSequence
+
+
+# number of strings with memoized ENS normalization results, shared by all analyses
+ENS_PROCESS_CACHE_SIZE = 2**14
+# longer strings are not memoized, their results are large and rarely repeated
+CACHED_TEXT_LENGTH = 64
+
+
+class CureStatus(Enum):
+    CURED = auto()
+    UNCURABLE = auto()
+    OMITTED = auto()
+    ITERATION_LIMIT = auto()
+    TIME_LIMIT = auto()
+
+
+class CureResult(NamedTuple):
+    cured: Optional[str]
+    status: CureStatus
+    iterations: int
+
+
+def _ens_process(text: str) -> ENSProcessResult:
+    return ens_process(
+        text,
+        do_normalize=True,
+        do_beautify=True,
+        do_normalizations=True,
+    )
+
+
+_memoized_ens_process = lru_cache(maxsize=ENS_PROCESS_CACHE_SIZE)(_ens_process)
+
+
+def cached_ens_process(text: str) -> ENSProcessResult:
+    """
+    Normalizes, beautifies and finds normalizations of the text in a single ens_process pass.
+    Results of texts up to CACHED_TEXT_LENGTH are memoized. The result must not be modified.
+    """
+    if len(text) > CACHED_TEXT_LENGTH:
+        return _ens_process(text)
+    return _memoized_ens_process(text)
+
+
+def any_error(result: ENSProcessResult) -> Optional[Union[DisallowedSequence, NormalizableSequence]]:
+    """
+    Returns the error or the first normalization of the text, `None` if the text is normalized.
+    """
+    return result.error or (result.normalizations[0] if result.normalizations else None)
+
+
+# results of finished cures (CURED or UNCURABLE), which do not depend on the budget, least recently used first;
+# not an lru_cache, because cures stopped by the budget must not be memoized
+_CURE_CACHE: OrderedDict[str, CureResult] = OrderedDict()
+_CURE_CACHE_LOCK = threading.Lock()
+
+
+def _apply_cure(text: str, error: CurableSequence) -> str:
+    return text[:error.index] + error.suggested + text[error.index + len(error.sequence):]
+
+
+def _cure(text: str,
+          max_iterations: Optional[int],
+          timeout: Optional[float],
+          result: Optional[ENSProcessResult]) -> CureResult:
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    # the first normalization is shared with the analysis
+    if result is None:
+        result = cached_ens_process(text)
+    iterations = 1
+    # same bound as ens_cure, every cure removes at least one character
+    for _ in range(2 * len(text) + 1):
+        if result.error is None:
+            return CureResult(result.normalized, CureStatus.CURED, iterations)
+        if not isinstance(result.error, CurableSequence):
+            return CureResult(None, CureStatus.UNCURABLE, iterations)
+        if max_iterations is not None and iterations >= max_iterations:
+            return CureResult(None, CureStatus.ITERATION_LIMIT, iterations)
+        if deadline is not None and time.perf_counter() > deadline:
+            return CureResult(None, CureStatus.TIME_LIMIT, iterations)
+
+        text = _apply_cure(text, result.error)
+        result = ens_process(text, do_normalize=True)
+        iterations += 1
+    return CureResult(None, CureStatus.UNCURABLE, iterations)
+
+
+def cure(text: str,
+         max_iterations: Optional[int] = None,
+         timeout: Optional[float] = None,
+         result: Optional[ENSProcessResult] = None) -> CureResult:
+    """
+    Works like ens_cure, but stops when the budget is exhausted.
+    Every iteration normalizes the text once and removes (or replaces) one disallowed sequence.
+    `max_iterations`: maximum number of normalizations, `None` for no limit
+    `timeout`: time limit in seconds, checked between iterations, `None` for no limit
+    `result`: result of `cached_ens_process(text)` if already computed
+    If the budget is exhausted, `cured` is `None` and `status` tells which limit was hit.
+    Finished cures of texts up to CACHED_TEXT_LENGTH are memoized.
+    """
+    with _CURE_CACHE_LOCK:
+        cached = _CURE_CACHE.get(text)
+        if cached is not None:
+            _CURE_CACHE.move_to_end(text)
+            return cached
+
+    result = _cure(text, max_iterations, timeout, result)
+    if result.status in (CureStatus.CURED, CureStatus.UNCURABLE) and len(text) <= CACHED_TEXT_LENGTH:
+        with _CURE_CACHE_LOCK:
+            _CURE_CACHE[text] = result
+            _CURE_CACHE.move_to_end(text)
+            if len(_CURE_CACHE) > ENS_PROCESS_CACHE_SIZE:
+                _CURE_CACHE.popitem(last=False)
+    return result
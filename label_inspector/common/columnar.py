@@ -0,0 +1,119 @@
+'''
+Columnar, dictionary-encoded representation of lists of JSON values (e.g. batch results).
+
+Values of the same field in all objects are stored together in a column and every distinct string
+is stored once in the `strings` table, so keys and repeated strings (scripts, types, names, descriptions)
+are not repeated per object. The document is plain JSON data and can be serialized as JSON or MessagePack.
+
+Document: `{"strings": [...], "length": n, "columns": column}`, where the column is one of:
+* `{"values": [...]}` - scalars (null, booleans and numbers) or values of mixed types as they are
+* `{"indices": [...]}` - strings, indices into `strings` (null for null)
+* `{"fields": {key: column}}` - objects, a column for every key appearing in any of them
+* `{"offsets": [...], "items": column}` - lists, items of the i-th list are `items[offsets[i]:offsets[i+1]]`
+
+Object and list columns may have `"nulls"` - positions of null values,
+object columns may have `"absent"` - for a key, positions of objects without the key.
+'''
+
+from typing import Dict, List
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def add(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+
+def _nulls(values: list) -> List[int]:
+    return [i for i, value in enumerate(values) if value is None]
+
+
+def _column(values: list, strings: _StringTable) -> dict:
+    types = {type(value) for value in values if value is not None}
+
+    if types == {str}:
+        return {'indices': [None if value is None else strings.add(value) for value in values]}
+
+    if types == {dict}:
+        keys = {}
+        for value in values:
+            if value is not None:
+                keys.update(dict.fromkeys(value))
+        column = {'fields': {
+            key: _column([None if value is None else value.get(key) for value in values], strings)
+            for key in keys
+        }}
+        absent = {}
+        for key in keys:
+            positions = [i for i, value in enumerate(values) if value is not None and key not in value]
+            if positions:
+                absent[key] = positions
+        if absent:
+            column['absent'] = absent
+        nulls = _nulls(values)
+        if nulls:
+            column['nulls'] = nulls
+        return column
+
+    if types == {list}:
+        offsets = [0]
+        items = []
+        for value in values:
+            if value is not None:
+                items.extend(value)
+            offsets.append(len(items))
+        column = {'offsets': offsets, 'items': _column(items, strings)}
+        nulls = _nulls(values)
+        if nulls:
+            column['nulls'] = nulls
+        return column
+
+    # scalars or mixed types
+    return {'values': values}
+
+
+def to_columns(values: list) -> dict:
+    '''
+    Encodes a list of JSON values (e.g. `model_dump(mode='json')` of results) as a columnar document.
+    '''
+    strings = _StringTable()
+    columns = _column(values, strings)
+    return {'strings': strings.strings, 'length': len(values), 'columns': columns}
+
+
+def _values(column: dict, length: int, strings: List[str]) -> list:
+    if 'values' in column:
+        return column['values']
+
+    if 'indices' in column:
+        return [None if i is None else strings[i] for i in column['indices']]
+
+    if 'fields' in column:
+        values = [{} for _ in range(length)]
+        for key, field in column['fields'].items():
+            absent = set(column.get('absent', {}).get(key, ()))
+            for i, value in enumerate(_values(field, length, strings)):
+                if i not in absent:
+                    values[i][key] = value
+    else:
+        offsets = column['offsets']
+        items = _values(column['items'], offsets[-1], strings)
+        values = [items[offsets[i]:offsets[i + 1]] for i in range(length)]
+
+    for i in column.get('nulls', ()):
+        values[i] = None
+    return values
+
+
+def from_columns(document: dict) -> list:
+    '''
+    Decodes a document created by `to_columns`.
+    '''
+    return _values(document['columns'], document['length'], document['strings'])
@@ -1,32 +1,149 @@
 '''
-Executes all functions registered with pickled_property, generating cache.
+Builds the cache of all functions registered with pickled_property.
 For each function, creates an instance of the function's class
 trying a default constructor first, then using the production config.
+Entries run in parallel processes, entries whose cache file (named by the dependency hash) exists are skipped.
+Memory-mapped files (FILE_ENTRIES) are built as well.
+Every entry is loaded back and verified, stale cache files are removed.
 '''
 
-import shutil
+from typing import NamedTuple, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import importlib
+import os
+import time
 
 import label_inspector.inspector
 # if there are modules not imported by inspector, import them here
 
 from label_inspector.common import pickle_cache
-from label_inspector.config import initialize_inspector_config
+from label_inspector.common.myunicode.columns import Columns
+from label_inspector.config import load_inspector_config
+
+
+Entry = Tuple[str, str, str]
+
+
+class BuildResult(NamedTuple):
+    entry: Entry
+    cache_name: str
+    built: bool
+    seconds: float
+
+
+def _instance(module: str, class_name: str):
+    cls = getattr(importlib.import_module(module), class_name)
+    try:
+        # try default constructor
+        return cls()
+    except TypeError:
+        # pass config
+        return cls(load_inspector_config('prod_config'))
+
+
+def build_entry(entry: Entry, force: bool = False) -> BuildResult:
+    '''
+    Builds a single cache entry in CACHE_DIR unless it is up to date.
+    '''
+    module, class_name, func_name = entry
+    # write only to the bundled cache, ignoring overlays
+    pickle_cache.set_storage(pickle_cache.DirectoryStorage(pickle_cache.CACHE_DIR))
+
+    obj = _instance(module, class_name)
+    cache_name = pickle_cache.cache_name(obj, func_name)
+    cache_file = os.path.join(pickle_cache.CACHE_DIR, cache_name)
+
+    if os.path.exists(cache_file):
+        if not force:
+            return BuildResult(entry, cache_name, built=False, seconds=0.0)
+        os.remove(cache_file)
+
+    start = time.perf_counter()
+    getattr(obj, func_name)
+    return BuildResult(entry, cache_name, built=True, seconds=time.perf_counter() - start)
+
+
+# methods returning paths of files created with cached_file
+FILE_ENTRIES = [
+    ('label_inspector.common.myunicode.data', 'MyUnicodeData', 'columns_path'),
+    ('label_inspector.components.features', 'Features', 'char_types_path'),
+]
+
+
+def build_file(entry: Entry, force: bool = False) -> BuildResult:
+    '''
+    Builds a memory-mapped file (see `cached_file`) unless it is up to date.
+    '''
+    module, class_name, func_name = entry
+    pickle_cache.set_storage(pickle_cache.DirectoryStorage(pickle_cache.CACHE_DIR))
+
+    obj = _instance(module, class_name)
+    existing = set(os.listdir(pickle_cache.CACHE_DIR))
+    start = time.perf_counter()
+    path = getattr(obj, func_name)()
+    cache_name = os.path.basename(path)
+    built = cache_name not in existing
+    if force and not built:
+        os.remove(path)
+        getattr(obj, func_name)()
+        built = True
+    return BuildResult(entry, cache_name, built=built, seconds=time.perf_counter() - start if built else 0.0)
+
+
+def remove_stale(cache_names: set[str]) -> list[str]:
+    '''
+    Removes files of registered functions and files which are not in `cache_names` and leftover temporary files.
+    Digest files of memory-mapped files are kept with their files.
+    '''
+    prefixes = tuple(f'{module}.{class_name}.{func_name}-'
+                     for module, class_name, func_name in pickle_cache.REGISTERED_FUNCTIONS)
+    prefixes += tuple(f'{name}-' for name in pickle_cache.REGISTERED_FILES)
+    removed = []
+    for name in sorted(os.listdir(pickle_cache.CACHE_DIR)):
+        if name.endswith('.tmp') or (name.startswith(prefixes)
+                                     and name.removesuffix(pickle_cache.DIGEST_SUFFIX) not in cache_names):
+            os.remove(os.path.join(pickle_cache.CACHE_DIR, name))
+            removed.append(name)
+    return removed
 
 
 def main():
-    with initialize_inspector_config('prod_config') as config:
-        print('Removing old cache')
-        shutil.rmtree(pickle_cache.CACHE_DIR, ignore_errors=True)
-
-        for module, class_name, func_name in pickle_cache.REGISTERED_FUNCTIONS:
-            print(f'Generating {module} {class_name}.{func_name}')
-            exec(f'import {module}')
-            try:
-                # try default constructor
-                exec(f'{module}.{class_name}().{func_name}')
-            except TypeError:
-                # pass config
-                exec(f'{module}.{class_name}(config).{func_name}')
+    parser = argparse.ArgumentParser(description='Build the pickled_property cache.')
+    parser.add_argument('--force', action='store_true', help='rebuild up-to-date entries')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (all cores by default)')
+    args = parser.parse_args()
+
+    entries = sorted(pickle_cache.REGISTERED_FUNCTIONS)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(build_entry, entries, [args.force] * len(entries)))
+    # built in this process, so that names of the files are registered for remove_stale
+    files = [build_file(entry, args.force) for entry in FILE_ENTRIES]
+
+    storage = pickle_cache.DirectoryStorage(pickle_cache.CACHE_DIR)
+    failed = []
+    for result in results + files:
+        module, class_name, func_name = result.entry
+        try:
+            if result in files:
+                Columns(storage.file_path(result.cache_name))
+            else:
+                storage.load(result.cache_name)
+            size = os.path.getsize(os.path.join(pickle_cache.CACHE_DIR, result.cache_name))
+            status = 'built' if result.built else 'up to date'
+        except (KeyError, ValueError):
+            failed.append(result.cache_name)
+            size = 0
+            status = 'FAILED'
+        print(f'{status:>10} {result.seconds:8.2f}s {size / 2**20:8.2f} MiB  {module} {class_name}.{func_name}')
+
+    for name in remove_stale({result.cache_name for result in results + files}):
+        print(f'Removed stale {name}')
+
+    print(f'Done in {time.perf_counter() - start:.2f}s')
+    if failed:
+        raise SystemExit(f'Verification failed: {", ".join(failed)}')
 
 
 if __name__ == '__main__':
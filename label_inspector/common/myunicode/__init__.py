@@ -19,3 +19,4 @@ from .myunicode import (
 )
 
 from . import grapheme
+from . import bulk
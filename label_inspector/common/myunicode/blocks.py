@@ -1,10 +1,17 @@
 from bisect import bisect_right
+from typing import Callable, List, Tuple
 from .data import MY_UNICODE_DATA
 
 
-RANGES = MY_UNICODE_DATA['blocks']
-STARTS, NAMES = RANGES['starts'], RANGES['names']
+def bisect_block(chr: str) -> str:
+    starts, names = MY_UNICODE_DATA.ranges('blocks', 'names')
+    return names[bisect_right(starts, ord(chr)) - 1]
 
 
-def bisect_block(chr: str) -> str:
-    return NAMES[bisect_right(STARTS, ord(chr)) - 1]
+def block_ranges(name_filter: Callable[[str], bool]) -> List[Tuple[int, int]]:
+    '''
+    Returns codepoint ranges [start, stop) of blocks with names accepted by the filter.
+    '''
+    starts, names = MY_UNICODE_DATA.ranges('blocks', 'names')
+    return [(start, stop) for start, stop, name in zip(starts, list(starts[1:]) + [0x110000], names)
+            if name is not None and name_filter(name)]
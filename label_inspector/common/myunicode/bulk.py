@@ -0,0 +1,174 @@
+'''
+Bulk variants of the myunicode functions, for many characters in one call.
+
+Every function accepts a string, a sequence of codepoints (e.g. `array('I')`) or a NumPy array of codepoints.
+For NumPy input the result is a NumPy array computed with vectorized lookups:
+`searchsorted` over the range tables (scripts, blocks, emoji) and indexing of the codepoint columns.
+Otherwise the result is a list (an `array('B')` for combining classes) and every distinct codepoint is looked up once.
+NumPy is not a dependency, it is only used when NumPy arrays are passed.
+'''
+
+from typing import Callable, Dict, Optional, Sequence, Union
+from array import array
+from collections import Counter
+from functools import cache
+import sys
+
+from .data import MY_UNICODE_DATA
+from .blocks import bisect_block
+from .scripts import bisect_script
+from .emojis import bisect_emoji
+from .myunicode import name, category, combining, unicode_version
+
+
+Chars = Union[str, Sequence[int]]
+
+
+def _is_numpy(chars) -> bool:
+    return type(chars).__module__ == 'numpy'
+
+
+def _codepoints(chars: Chars) -> Sequence[int]:
+    return list(map(ord, chars)) if isinstance(chars, str) else chars
+
+
+def _map_unique(func: Callable[[int], object], chars: Chars) -> list:
+    '''
+    Applies func to every codepoint, computing it once per distinct codepoint.
+    '''
+    codepoints = _codepoints(chars)
+    values = {cp: func(cp) for cp in set(codepoints)}
+    return [values[cp] for cp in codepoints]
+
+
+def _map_unique_numpy(func: Callable[[int], object], codepoints, dtype):
+    np = sys.modules['numpy']
+    unique, inverse = np.unique(codepoints, return_inverse=True)
+    return np.array([func(int(cp)) for cp in unique], dtype=dtype)[inverse]
+
+
+@cache
+def _numpy_ranges(key: str, values_key: str, default=None):
+    np = sys.modules['numpy']
+    ranges = MY_UNICODE_DATA[key]
+    values = [default if value is None else value for value in ranges[values_key]]
+    return np.array(ranges['starts'], dtype=np.int64), np.array(values, dtype=object)
+
+
+def _range_indices_numpy(key: str, values_key: str, codepoints, default=None):
+    np = sys.modules['numpy']
+    starts, _ = _numpy_ranges(key, values_key, default)
+    return np.searchsorted(starts, codepoints, side='right') - 1
+
+
+def _ranges_numpy(key: str, values_key: str, codepoints, default=None, dtype=object):
+    _, values = _numpy_ranges(key, values_key, default)
+    return values[_range_indices_numpy(key, values_key, codepoints, default)].astype(dtype)
+
+
+def _column_numpy(key: str, codepoints, fallback: Callable[[int], object], dtype):
+    '''
+    Looks up codepoints in a column of MY_UNICODE_DATA,
+    codepoints missing from the column are passed to the fallback (once per distinct codepoint).
+    '''
+    np = sys.modules['numpy']
+    column = MY_UNICODE_DATA[key]
+    stage1 = np.frombuffer(column.stage1, dtype=np.uint16)
+    stage2 = np.frombuffer(column.stage2, dtype=column.stage2.format)
+
+    codepoints = np.asarray(codepoints, dtype=np.int64)
+    values = stage2[(stage1[codepoints >> 8].astype(np.int64) << 8) | (codepoints & 0xFF)]
+    missing = values == column.missing
+    if column.labels is not None:
+        out = np.array(column.labels, dtype=object)[np.where(missing, 0, values)]
+    else:
+        out = values.astype(dtype)
+    if missing.any():
+        out[missing] = _map_unique_numpy(fallback, codepoints[missing], dtype)
+    return out
+
+
+def _name_or_default(cp: int, default):
+    try:
+        return name(chr(cp))
+    except ValueError:
+        return default
+
+
+def names(chars: Chars, default: Optional[str] = None):
+    '''
+    Returns names of the characters, `default` for characters without a name.
+    '''
+    if _is_numpy(chars):
+        return _map_unique_numpy(lambda cp: _name_or_default(cp, default), chars, object)
+    return _map_unique(lambda cp: _name_or_default(cp, default), chars)
+
+
+def categories(chars: Chars):
+    '''
+    Returns categories of the characters (see `category`).
+    '''
+    if _is_numpy(chars):
+        return _column_numpy('category', chars, lambda cp: category(chr(cp)), object)
+    return _map_unique(lambda cp: category(chr(cp)), chars)
+
+
+def combining_classes(chars: Chars):
+    '''
+    Returns combining classes of the characters (see `combining`).
+    '''
+    if _is_numpy(chars):
+        return _column_numpy('combining', chars, lambda cp: combining(chr(cp)), sys.modules['numpy'].uint8)
+    return array('B', _map_unique(lambda cp: combining(chr(cp)), chars))
+
+
+def scripts(chars: Chars):
+    '''
+    Returns scripts of the characters, 'Unknown' for characters without a script.
+    '''
+    if _is_numpy(chars):
+        return _ranges_numpy('scripts', 'names', chars, default='Unknown')
+    return _map_unique(lambda cp: bisect_script(chr(cp)), chars)
+
+
+def blocks(chars: Chars):
+    '''
+    Returns blocks of the characters, None for characters without a block.
+    '''
+    if _is_numpy(chars):
+        return _ranges_numpy('blocks', 'names', chars)
+    return _map_unique(lambda cp: bisect_block(chr(cp)), chars)
+
+
+def is_emoji_chars(chars: Chars):
+    '''
+    Returns for every character whether it is an emoji (see `is_emoji_char`).
+    '''
+    if _is_numpy(chars):
+        return _ranges_numpy('emojis', 'is_emoji', chars, dtype=bool)
+    return _map_unique(lambda cp: bisect_emoji(chr(cp)), chars)
+
+
+def unicode_versions(chars: Chars):
+    '''
+    Returns unicode versions of the characters, None for characters not assigned to any version.
+    '''
+    if _is_numpy(chars):
+        return _map_unique_numpy(lambda cp: unicode_version(chr(cp)), chars, object)
+    return _map_unique(lambda cp: unicode_version(chr(cp)), chars)
+
+
+def script_counts(chars: Chars) -> Dict[str, int]:
+    '''
+    Returns the number of characters of every script (the script distribution of the text).
+    '''
+    if _is_numpy(chars):
+        np = sys.modules['numpy']
+        _, values = _numpy_ranges('scripts', 'names', 'Unknown')
+        counts = np.bincount(_range_indices_numpy('scripts', 'names', chars, 'Unknown'), minlength=len(values))
+        result = Counter()
+        for script, count in zip(values, counts.tolist()):
+            if count:
+                result[script] += count
+        return dict(result)
+    return dict(Counter(scripts(chars)))
@@ -0,0 +1,225 @@
+'''
+Columnar, memory-mapped storage of per-codepoint properties.
+
+Every column is a two-stage table over all codepoints:
+`stage2[(stage1[cp >> 8] << 8) | (cp & 0xFF)]` is the value of codepoint `cp`,
+identical blocks of 256 values are stored once. Values index into a list of labels
+(e.g. category names) or, for names, into a string pool.
+
+File layout:
+* COLUMNS_MAGIC
+* header length (little-endian uint32) and JSON header with the layout of the arrays
+* arrays, each aligned to 8 bytes
+
+Arrays are read straight from the mapped file, so pages are shared between processes
+and only the pages of looked up codepoints are loaded.
+'''
+
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from array import array
+import json
+import mmap
+import struct
+import sys
+
+
+COLUMNS_MAGIC = b'LIUCOLS1'
+MAX_CODEPOINT = 0x110000
+BLOCK_BITS = 8
+BLOCK_SIZE = 1 << BLOCK_BITS
+BLOCK_MASK = BLOCK_SIZE - 1
+
+# typecode of values and the value marking codepoints without data
+_VALUE_TYPES = {
+    'B': 0xFF,
+    'H': 0xFFFF,
+    'I': 0xFFFFFFFF,
+}
+
+_HEADER_LENGTH = struct.Struct('<I')
+_ALIGNMENT = 8
+
+_NOT_FOUND = object()
+
+
+def _value_type(n: int) -> str:
+    for typecode, missing in _VALUE_TYPES.items():
+        if n < missing:
+            return typecode
+    raise ValueError(f'too many values: {n}')
+
+
+def _two_stage(values: array) -> Tuple[array, array]:
+    '''
+    Splits values of all codepoints into blocks, storing every distinct block once.
+    '''
+    blocks = {}
+    stage1 = array('H')
+    stage2 = array(values.typecode)
+    for start in range(0, MAX_CODEPOINT, BLOCK_SIZE):
+        block = values[start:start + BLOCK_SIZE]
+        key = block.tobytes()
+        index = blocks.get(key)
+        if index is None:
+            index = blocks[key] = len(blocks)
+            stage2.extend(block)
+        stage1.append(index)
+    return stage1, stage2
+
+
+class ColumnsWriter:
+    def __init__(self):
+        self.arrays: Dict[str, array] = {}
+        self.header = {}
+
+    def add_column(self, name: str, data: Dict[int, object], labels: Optional[List] = None):
+        '''
+        Adds a column with values of `data` (codepoint -> value).
+        If `labels` are given, they are the distinct values of data, otherwise values must be ints.
+        '''
+        if labels is not None:
+            label_index = {label: i for i, label in enumerate(labels)}
+            data = {cp: label_index[value] for cp, value in data.items()}
+        typecode = _value_type(max(data.values(), default=0) + 1)
+        missing = _VALUE_TYPES[typecode]
+
+        values = array(typecode, [missing]) * MAX_CODEPOINT
+        for cp, value in data.items():
+            values[cp] = value
+
+        stage1, stage2 = _two_stage(values)
+        self.arrays[f'{name}.stage1'] = stage1
+        self.arrays[f'{name}.stage2'] = stage2
+        self.header.setdefault('columns', {})[name] = {'missing': missing, 'labels': labels}
+
+    def add_string_column(self, name: str, data: Dict[int, str]):
+        '''
+        Adds a column of strings stored in a pool (UTF-8), the column values are string indices.
+        '''
+        codes = sorted(data)
+        pool = bytearray()
+        offsets = array('I', [0])
+        for cp in codes:
+            pool += data[cp].encode('utf-8')
+            offsets.append(len(pool))
+        self.add_column(name, {cp: i for i, cp in enumerate(codes)})
+        self.arrays[f'{name}.offsets'] = offsets
+        self.arrays[f'{name}.pool'] = array('B', pool)
+        self.header['columns'][name]['pool'] = True
+
+    def write(self, f: BinaryIO):
+        header = dict(self.header, byteorder=sys.byteorder, arrays={})
+        # offsets relative to the end of the header
+        offset = 0
+        for name, arr in self.arrays.items():
+            header['arrays'][name] = [arr.typecode, offset, len(arr)]
+            offset += -(-len(arr) * arr.itemsize // _ALIGNMENT) * _ALIGNMENT
+
+        header_bytes = json.dumps(header).encode('utf-8')
+        start = len(COLUMNS_MAGIC) + _HEADER_LENGTH.size + len(header_bytes)
+        header_bytes += b' ' * (-start % _ALIGNMENT)
+
+        f.write(COLUMNS_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for arr in self.arrays.values():
+            data = arr.tobytes()
+            f.write(data)
+            f.write(b'\0' * (-len(data) % _ALIGNMENT))
+
+
+class StringPool:
+    def __init__(self, offsets: memoryview, pool: memoryview):
+        self.offsets = offsets
+        self.pool = pool
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.pool[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+class Column:
+    '''
+    Read-only mapping codepoint -> value.
+    '''
+
+    def __init__(self, stage1: memoryview, stage2: memoryview, missing: int, labels=None):
+        self.stage1 = stage1
+        self.stage2 = stage2
+        self.missing = missing
+        self.labels = labels
+
+    # lookups are hot, BLOCK_BITS and BLOCK_MASK are inlined
+    def get(self, cp: int, default=None):
+        if 0 <= cp < MAX_CODEPOINT:
+            value = self.stage2[(self.stage1[cp >> 8] << 8) | (cp & 0xFF)]
+            if value != self.missing:
+                return value if self.labels is None else self.labels[value]
+        return default
+
+    def __getitem__(self, cp: int):
+        if 0 <= cp < MAX_CODEPOINT:
+            value = self.stage2[(self.stage1[cp >> 8] << 8) | (cp & 0xFF)]
+            if value != self.missing:
+                return value if self.labels is None else self.labels[value]
+        raise KeyError(cp)
+
+    def __contains__(self, cp: int) -> bool:
+        return self.get(cp, _NOT_FOUND) is not _NOT_FOUND
+
+
+class CharColumn:
+    '''
+    Read-only mapping text -> value, single characters are looked up in a column, other strings in `extra`.
+    '''
+
+    def __init__(self, column: Column, extra: Dict[str, object]):
+        self.column = column
+        self.extra = extra
+
+    def get(self, text: str, default=None):
+        if len(text) == 1:
+            return self.column.get(ord(text), default)
+        return self.extra.get(text, default)
+
+    def __getitem__(self, text: str):
+        value = self.get(text, _NOT_FOUND)
+        if value is _NOT_FOUND:
+            raise KeyError(text)
+        return value
+
+    def __contains__(self, text: str) -> bool:
+        return self.get(text, _NOT_FOUND) is not _NOT_FOUND
+
+
+class Columns:
+    '''
+    Columns of a memory-mapped file written by ColumnsWriter.
+    '''
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        offset = len(COLUMNS_MAGIC)
+        if self._mmap[:offset] != COLUMNS_MAGIC:
+            raise ValueError(f'{path} is not a columns file')
+        header_length, = _HEADER_LENGTH.unpack_from(self._mmap, offset)
+        offset += _HEADER_LENGTH.size
+        self.header = json.loads(self._mmap[offset:offset + header_length])
+        offset += header_length
+        if self.header['byteorder'] != sys.byteorder:
+            raise ValueError(f'{path} was written on a {self.header["byteorder"]}-endian machine')
+
+        view = memoryview(self._mmap)
+        self._arrays = {}
+        for name, (typecode, start, length) in self.header['arrays'].items():
+            itemsize = array(typecode).itemsize
+            data = view[offset + start:offset + start + length * itemsize]
+            self._arrays[name] = data if typecode == 'B' else data.cast(typecode)
+
+    def column(self, name: str) -> Column:
+        info = self.header['columns'][name]
+        labels = info['labels']
+        if info.get('pool'):
+            labels = StringPool(self._arrays[f'{name}.offsets'], self._arrays[f'{name}.pool'])
+        return Column(self._arrays[f'{name}.stage1'], self._arrays[f'{name}.stage2'], info['missing'], labels)
@@ -1,6 +1,17 @@
 import json
+from typing import Tuple
+from functools import cached_property
 from .utils import DATA_JSON_PATH
-from label_inspector.common.pickle_cache import pickled_property
+from .columns import Columns, ColumnsWriter, CharColumn
+from label_inspector.common.pickle_cache import pickled_property, cached_file
+
+
+COLUMNS_NAME = 'label_inspector.common.myunicode.data.MyUnicodeData._columns'
+# bump when the layout of the columns file changes
+COLUMNS_VERSION = 1
+
+# per-codepoint tables, stored in the memory-mapped columns file
+CODEPOINT_KEYS = ('name', 'category', 'combining')
 
 
 def make_int_dict(dict, key):
@@ -11,24 +22,78 @@ def remove_fe0f(dict, key):
     dict[key] = {emoji.replace('\ufe0f', ''): name for emoji, name in dict[key].items()}
 
 
+def load_json_data() -> dict:
+    with open(DATA_JSON_PATH, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+        make_int_dict(json_data, 'name')
+        make_int_dict(json_data, 'category')
+        make_int_dict(json_data, 'combining')
+        remove_fe0f(json_data, 'emoji_sequences')
+        remove_fe0f(json_data, 'emoji_zwj_sequences')
+        remove_fe0f(json_data['versions'], 'unicode')
+        remove_fe0f(json_data['versions'], 'emoji')
+        # replace None with {} to get KeyError if no special data found
+        json_data['special']['data'] = [{} if d is None else d for d in json_data['special']['data']]
+        return json_data
+
+
+def write_columns(f, json_data: dict):
+    writer = ColumnsWriter()
+    writer.add_string_column('name', json_data['name'])
+    writer.add_column('category', json_data['category'], labels=sorted(set(json_data['category'].values())))
+    writer.add_column('combining', json_data['combining'])
+    unicode_versions = {ord(c): v for c, v in json_data['versions']['unicode'].items() if len(c) == 1}
+    writer.add_column('unicode_version', unicode_versions, labels=sorted(set(unicode_versions.values())))
+    writer.write(f)
+
+
 class MyUnicodeData:
-    @pickled_property()
-    def _data(self):
-        with open(DATA_JSON_PATH, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-            make_int_dict(json_data, 'name')
-            make_int_dict(json_data, 'category')
-            make_int_dict(json_data, 'combining')
-            remove_fe0f(json_data, 'emoji_sequences')
-            remove_fe0f(json_data, 'emoji_zwj_sequences')
-            remove_fe0f(json_data['versions'], 'unicode')
-            remove_fe0f(json_data['versions'], 'emoji')
-            # replace None with {} to get KeyError if no special data found
-            json_data['special']['data'] = [{} if d is None else d for d in json_data['special']['data']]
-            return json_data
-    
+    '''
+    Unicode data from myunicode.json.
+    Per-codepoint tables (names, categories, combining classes and unicode versions) are read from
+    a memory-mapped columns file, which is shared between processes. Other tables are pickled.
+    '''
+
+    @pickled_property(files=[DATA_JSON_PATH])
+    def _tables(self):
+        json_data = load_json_data()
+        for key in CODEPOINT_KEYS:
+            del json_data[key]
+        # only sequences are not stored in the columns file
+        json_data['versions']['unicode'] = {c: v for c, v in json_data['versions']['unicode'].items() if len(c) != 1}
+        return json_data
+
+    def columns_path(self) -> str:
+        '''
+        Path of the columns file, created if it does not exist.
+        '''
+        return cached_file(COLUMNS_NAME, lambda f: write_columns(f, load_json_data()),
+                           files=[DATA_JSON_PATH], version=COLUMNS_VERSION)
+
+    @cached_property
+    def _columns(self) -> Columns:
+        return Columns(self.columns_path())
+
+    @cached_property
+    def _data(self) -> dict:
+        data = dict(self._tables)
+        for key in CODEPOINT_KEYS:
+            data[key] = self._columns.column(key)
+        data['versions'] = dict(data['versions'],
+                                unicode=CharColumn(self._columns.column('unicode_version'), data['versions']['unicode']))
+        return data
+
     def __getitem__(self, key: str):
         return self._data[key]
 
+    def ranges(self, key: str, values_key: str) -> Tuple[list, list]:
+        '''
+        Returns `(starts, values)` of a table of codepoint ranges (e.g. `ranges('scripts', 'names')`),
+        the value of codepoint `cp` is `values[bisect_right(starts, cp) - 1]`.
+        Tables are loaded on first use, so importing the lookup modules stays cheap.
+        '''
+        ranges = self._data[key]
+        return ranges['starts'], ranges[values_key]
+
 
 MY_UNICODE_DATA = MyUnicodeData()
@@ -1,22 +1,31 @@
-from typing import List, Optional, Set
+from typing import List, Optional
+import re
 import regex
-from label_inspector.common.myunicode import emoji_zwj_sequence_name, emoji_sequence_name, block_of, is_emoji
-from label_inspector.common.pickle_cache import pickled_property
+from label_inspector.common.myunicode import emoji_zwj_sequence_name, emoji_sequence_name, is_emoji
+from label_inspector.common.myunicode.blocks import block_ranges
 
 
-class AllHanguls:
-    @pickled_property()
-    def hangul_jamo(self) -> Set[str]:
-        chars = set()
-        for c in map(chr, range(0x10FFFF + 1)):
-            block = block_of(c) or ''
-            # only jamo, not syllables
-            if block.find('Hangul') != -1 and block.find('Jamo') != -1:
-                chars.add(c)
-        return chars
+def _is_hangul_jamo_block(block: str) -> bool:
+    # only jamo, not syllables
+    return block.find('Hangul') != -1 and block.find('Jamo') != -1
+
+
+_HANGUL_JAMO_REGEX = None
+
+
+def _hangul_jamo_regex() -> re.Pattern:
+    '''
+    Character class matching a single Hangul Jamo character, built from the block ranges on first use.
+    Uses the builtin re module, which scans a plain character class faster than regex.
+    '''
+    global _HANGUL_JAMO_REGEX
+    if _HANGUL_JAMO_REGEX is None:
+        ranges = ''.join(f'\\U{start:08x}-\\U{stop - 1:08x}'
+                         for start, stop in block_ranges(_is_hangul_jamo_block))
+        _HANGUL_JAMO_REGEX = re.compile(f'[{ranges}]')
+    return _HANGUL_JAMO_REGEX
 
 
-_ALL_HANGULS = AllHanguls()
 _GRAPHEME_REGEX = regex.compile(r'\X')
 
 INVISIBLE_CHARACTER_JOINERS = invisible_joiners = {
@@ -92,20 +101,18 @@ def split(text: str, split_invisible: bool = True) -> List[str]:
                     out.append(g[j])
         graphemes = out
 
-    if not _ALL_HANGULS.hangul_jamo.intersection(text):
+    hangul_jamo = _hangul_jamo_regex()
+    if hangul_jamo.search(text) is None:
         return graphemes
 
     out = []
     for g in graphemes:
         i = 0
-        j = 1
-        while j < len(g):
-            # split on hangul
-            if g[j] in _ALL_HANGULS.hangul_jamo:
-                out.append(g[i:j])
-                i = j
-            j += 1
-        out.append(g[i:j])
+        # split on hangul
+        for m in hangul_jamo.finditer(g, 1):
+            out.append(g[i:m.start()])
+            i = m.start()
+        out.append(g[i:])
     return out
 
 
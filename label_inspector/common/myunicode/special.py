@@ -2,12 +2,9 @@ from bisect import bisect_right
 from .data import MY_UNICODE_DATA
 
 
-RANGES = MY_UNICODE_DATA['special']
-STARTS, DATA = RANGES['starts'], RANGES['data']
-
-
 def bisect_special(chr: str) -> str:
-    return DATA[bisect_right(STARTS, ord(chr)) - 1]
+    starts, data = MY_UNICODE_DATA.ranges('special', 'data')
+    return data[bisect_right(starts, ord(chr)) - 1]
 
 
 def get_special_name(chr: str) -> str:
@@ -1,14 +1,50 @@
-from typing import TypeVar, Callable
+from abc import ABC, abstractmethod
+from typing import TypeVar, Callable, Hashable, Iterable, Optional, BinaryIO
 from functools import wraps, cached_property
+import gc
 import os
 import pickle
 import hashlib
+import stat
+import tempfile
+import time
+
+from label_inspector.data import get_resource_path
 
 
 R = TypeVar('R')
 
+# cache files bundled with the package, may be read-only when installed
 CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache')
+# writable directory checked before CACHE_DIR, e.g. a shared volume
+OVERLAY_DIR = os.environ.get('INSPECTOR_CACHE_DIR')
+# used for new cache files when neither OVERLAY_DIR nor CACHE_DIR is writable,
+# per user and only used if private (see PrivateDirectoryStorage)
+FALLBACK_DIR = os.path.join(tempfile.gettempdir(), f'label_inspector_cache-{os.getuid()}')
 REGISTERED_FUNCTIONS = set()
+# name prefixes of files created with cached_file
+REGISTERED_FILES = set()
+
+# bump to invalidate all cache files, e.g. when the file format changes
+CACHE_VERSION = 1
+# every cache file starts with CACHE_MAGIC and the digest of the pickled value
+CACHE_MAGIC = b'LIPCACHE'
+_DIGEST_SIZE = 32
+
+# cache entries loaded in memory (e.g. from a snapshot), checked before CACHE_DIR
+_PRELOADED = {}
+
+# content digests of dependency files, keyed by (path, size, mtime)
+_FILE_DIGESTS = {}
+# files created with cached_file are verified against the digest stored in {file}{DIGEST_SUFFIX}
+DIGEST_SUFFIX = '.digest'
+# stored files verified in this process, keyed by (path, size, mtime)
+_VERIFIED_FILES = set()
+_RACY_MTIME_NS = 2_000_000_000
+
+
+class CorruptedCacheError(Exception):
+    pass
 
 
 def _get_config_val(config, key: str) -> str:
@@ -17,46 +53,418 @@ def _get_config_val(config, key: str) -> str:
     return config
 
 
-def _hash_deps(config, dep_keys: list[str]) -> str:
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+def _file_paths(path: str) -> Iterable[str]:
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+    else:
+        yield path
+
+
+def _path_digest(path: str) -> Optional[bytes]:
+    '''
+    Digest of the contents of a file or of all files in a directory, None if the path does not exist.
+    '''
+    if not os.path.exists(path):
+        return None
+    hash = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    for file_path in _file_paths(path):
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_size, stat.st_mtime_ns)
+        digest = _FILE_DIGESTS.get(key)
+        if digest is None:
+            with open(file_path, 'rb') as f:
+                digest = _digest(f.read())
+            # a file modified within the mtime resolution may change again without changing the key
+            if time.time_ns() - stat.st_mtime_ns > _RACY_MTIME_NS:
+                _FILE_DIGESTS[key] = digest
+        hash.update(os.path.relpath(file_path, path).encode('utf-8'))
+        hash.update(digest)
+    return hash.digest()
+
+
+def _hash_deps(config, dep_keys: Iterable[str], files: Iterable[str] = (), version: Hashable = 0) -> str:
+    '''
+    Hashes the config values of dependencies and the contents of dependency files.
+    String config values which are paths of existing resources are treated as files.
+    '''
     hash = hashlib.md5()
+    hash.update(pickle.dumps((CACHE_VERSION, version)))
     for key in dep_keys:
+        value = _get_config_val(config, key)
         hash.update(pickle.dumps(key))
-        hash.update(pickle.dumps(_get_config_val(config, key)))
+        hash.update(pickle.dumps(value))
+        if isinstance(value, str):
+            hash.update(pickle.dumps(_path_digest(get_resource_path(value))))
+    for path in files:
+        hash.update(pickle.dumps(_path_digest(path)))
     return hash.hexdigest()
 
 
-def pickled_property(*dependencies: str):
+def _cache_name(obj, pickle_name: str, dependencies: tuple[str, ...], files: tuple[str, ...], version: Hashable) -> str:
+    config = obj.config if dependencies else None
+    return f'{pickle_name}-{_hash_deps(config, dependencies, files, version)}.pickle'
+
+
+def unpickle(data):
+    '''
+    Unpickles cached values (bytes-like data), without garbage collection passes.
+    '''
+    # unpickling only creates new objects, garbage collection passes during loading are wasted
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _load(cache_file: str):
+    '''
+    Loads a cache file, raises CorruptedCacheError if it fails the integrity check.
+    '''
+    with open(cache_file, 'rb') as f:
+        data = f.read()
+    header_size = len(CACHE_MAGIC) + _DIGEST_SIZE
+    payload = memoryview(data)[header_size:]
+    if data[:len(CACHE_MAGIC)] != CACHE_MAGIC or data[len(CACHE_MAGIC):header_size] != _digest(payload):
+        raise CorruptedCacheError(f'{cache_file} is corrupted')
+    return unpickle(payload)
+
+
+def _write_atomic(path: str, write: Callable[[BinaryIO], None]):
+    '''
+    Writes a file atomically with `write(f)`, concurrent readers see either no file or a complete one.
+    '''
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates files readable only by the owner
+            os.fchmod(f.fileno(), 0o644)
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_digest(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return _digest(f.read())
+
+
+def _verify_file(path: str) -> bool:
+    '''
+    Checks a stored file against its digest file, once per process unless the file changes.
+    '''
+    stat_result = os.stat(path)
+    key = (path, stat_result.st_size, stat_result.st_mtime_ns)
+    if key in _VERIFIED_FILES:
+        return True
+    try:
+        with open(path + DIGEST_SUFFIX, 'rb') as f:
+            expected = f.read()
+    except FileNotFoundError:
+        return False
+    if expected != CACHE_MAGIC + _read_digest(path):
+        return False
+    _VERIFIED_FILES.add(key)
+    return True
+
+
+def _store(cache_file: str, value):
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(f: BinaryIO):
+        f.write(CACHE_MAGIC)
+        f.write(_digest(payload))
+        f.write(payload)
+
+    _write_atomic(cache_file, write)
+
+
+class CacheStorage(ABC):
+    '''
+    Stores cache values by cache file name.
+    '''
+
+    @abstractmethod
+    def load(self, name: str):
+        '''
+        Returns the stored value, raises KeyError if there is no valid entry.
+        '''
+
+    @abstractmethod
+    def store(self, name: str, value):
+        '''
+        Stores the value, raises OSError if the storage is not writable.
+        '''
+
+    @abstractmethod
+    def file_path(self, name: str) -> str:
+        '''
+        Returns the path of a stored file (see `cached_file`), raises KeyError if there is no valid file.
+        '''
+
+    @abstractmethod
+    def store_file(self, name: str, write: Callable[[BinaryIO], None]):
+        '''
+        Stores a file written with `write(f)`, raises OSError if the storage is not writable.
+        '''
+
+
+class DirectoryStorage(CacheStorage):
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+
+    def load(self, name: str):
+        try:
+            return _load(os.path.join(self.path, name))
+        except (OSError, CorruptedCacheError):
+            raise KeyError(name)
+
+    def store(self, name: str, value):
+        if self.read_only:
+            raise PermissionError(f'{self.path} is read-only')
+        _store(os.path.join(self.path, name), value)
+
+    def file_path(self, name: str) -> str:
+        path = os.path.join(self.path, name)
+        try:
+            if _verify_file(path):
+                return path
+        except OSError:
+            pass
+        raise KeyError(name)
+
+    def store_file(self, name: str, write: Callable[[BinaryIO], None]):
+        if self.read_only:
+            raise PermissionError(f'{self.path} is read-only')
+        path = os.path.join(self.path, name)
+        _write_atomic(path, write)
+        digest = CACHE_MAGIC + _read_digest(path)
+        _write_atomic(path + DIGEST_SUFFIX, lambda f: f.write(digest))
+
+
+class PrivateDirectoryStorage(DirectoryStorage):
+    '''
+    Directory in a location shared with other users (e.g. /tmp). It is created with mode 0700
+    and only used if it is owned by the current user and not accessible to others,
+    so that no other user can plant files that get unpickled.
+    '''
+
+    def _is_private(self) -> bool:
+        try:
+            st = os.lstat(self.path)
+        except OSError:
+            return False
+        return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+    def _check_private(self):
+        try:
+            os.mkdir(self.path, 0o700)
+        except FileExistsError:
+            pass
+        if not self._is_private():
+            raise PermissionError(f'{self.path} is not a private directory of the current user')
+
+    def load(self, name: str):
+        if not self._is_private():
+            raise KeyError(name)
+        return super().load(name)
+
+    def store(self, name: str, value):
+        self._check_private()
+        super().store(name, value)
+
+    def file_path(self, name: str) -> str:
+        if not self._is_private():
+            raise KeyError(name)
+        return super().file_path(name)
+
+    def store_file(self, name: str, write: Callable[[BinaryIO], None]):
+        self._check_private()
+        super().store_file(name, write)
+
+
+class TieredStorage(CacheStorage):
+    '''
+    Loads from the first tier having the entry, stores to the first writable tier.
+    '''
+
+    def __init__(self, tiers: list[CacheStorage]):
+        if not tiers:
+            raise ValueError('TieredStorage needs at least one tier')
+        self.tiers = tiers
+
+    def _first(self, method: str, name: str, *args):
+        for tier in self.tiers:
+            try:
+                return getattr(tier, method)(name, *args)
+            except KeyError:
+                pass
+        raise KeyError(name)
+
+    def _first_writable(self, method: str, name: str, *args):
+        error = None
+        for tier in self.tiers:
+            try:
+                return getattr(tier, method)(name, *args)
+            except OSError as e:
+                error = e
+        raise error
+
+    def load(self, name: str):
+        return self._first('load', name)
+
+    def store(self, name: str, value):
+        self._first_writable('store', name, value)
+
+    def file_path(self, name: str) -> str:
+        return self._first('file_path', name)
+
+    def store_file(self, name: str, write: Callable[[BinaryIO], None]):
+        self._first_writable('store_file', name, write)
+
+
+_STORAGE = None
+
+
+def set_storage(storage: Optional[CacheStorage]):
+    '''
+    Replaces the storage of all pickled properties, None restores the default.
+    '''
+    global _STORAGE
+    _STORAGE = storage
+
+
+def get_storage() -> CacheStorage:
+    '''
+    The storage set with `set_storage` or the default: OVERLAY_DIR (if set), CACHE_DIR and FALLBACK_DIR.
+    '''
+    if _STORAGE is not None:
+        return _STORAGE
+    tiers = [DirectoryStorage(path) for path in (OVERLAY_DIR, CACHE_DIR) if path]
+    if FALLBACK_DIR:
+        tiers.append(PrivateDirectoryStorage(FALLBACK_DIR))
+    return TieredStorage(tiers)
+
+
+def cached_file(name: str, write: Callable[[BinaryIO], None], files: Iterable[str] = (), version: Hashable = 0) -> str:
+    '''
+    Returns the path of the cache file {name}-{hash}, for data read directly from disk (e.g. memory-mapped).
+    The hash works like in `pickled_property`, the file is created with `write(f)` if the storage has none
+    (or from the preloaded contents, see `file_entries`). Like pickles, the files are verified on first use,
+    a file not matching its stored digest is created again.
+    '''
+    REGISTERED_FILES.add(name)
+    file_name = f'{name}-{_hash_deps(None, (), tuple(files), version)}'
+    storage = get_storage()
+    try:
+        return storage.file_path(file_name)
+    except KeyError:
+        if file_name in _PRELOADED:
+            contents = _PRELOADED[file_name]
+            storage.store_file(file_name, lambda f: f.write(contents))
+        else:
+            storage.store_file(file_name, write)
+        return storage.file_path(file_name)
+
+
+def file_entries(paths: Iterable[str]) -> dict[str, bytes]:
+    '''
+    Returns files created with `cached_file` as cache entries (file name -> contents).
+    Preloaded file entries are written to the storage by `cached_file` instead of creating the files.
+    '''
+    entries = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            entries[os.path.basename(path)] = f.read()
+    return entries
+
+
+def preload(entries: dict[str, object]):
+    '''
+    Makes cache entries (cache file name -> value) available without reading CACHE_DIR.
+    '''
+    _PRELOADED.update(entries)
+
+
+def _pickled_properties(obj) -> dict[str, cached_property]:
+    properties = {}
+    for cls in reversed(type(obj).__mro__):
+        for name, attr in vars(cls).items():
+            if isinstance(attr, cached_property) and hasattr(attr, 'pickle_name'):
+                properties[name] = attr
+    return properties
+
+
+def cache_name(obj, property_name: str) -> str:
+    '''
+    Returns the cache file name of a pickled property of the object, without loading it.
+    '''
+    attr = _pickled_properties(obj)[property_name]
+    return _cache_name(obj, attr.pickle_name, attr.dependencies, attr.files, attr.version)
+
+
+def cache_entries(obj) -> dict[str, object]:
+    '''
+    Returns all pickled properties of the object as cache entries (cache file name -> value).
+    Properties which are not loaded yet are loaded or computed.
+    '''
+    return {cache_name(obj, name): getattr(obj, name) for name in _pickled_properties(obj)}
+
+
+def pickled_property(*dependencies: str, files: Iterable[str] = (), version: Hashable = 0):
     '''
     Works like functools.cached_property, but uses pickle to store the value.
     Expects the class to have a config property (unless there are no dependencies).
     Dependencies: keys in self.config this property depends on.
-    Value is recomputed when any of the dependency values change.
-    The pickle path is {CACHE_DIR}/{module}.{class}.{func}-{hash}.pickle
+    Files: paths (outside of config) of files or directories this property depends on.
+    Version: bump when the function changes in a way that invalidates stored values,
+    may be a tuple including versions of libraries the value is computed with.
+    Value is recomputed when any of the dependency values or the contents of dependency files change.
+    Config values which are resource paths (e.g. `inspector.confusables`) count as dependency files.
+    The pickle name is {module}.{class}.{func}-{hash}.pickle, files are kept by the storage (see `get_storage`).
+    Files are written atomically and verified on load, corrupted files are recomputed.
+    Entries added with `preload` take precedence over the pickle files.
     '''
+    files = tuple(files)
+
     def decorator(func: Callable[..., R]) -> cached_property[R]:
         pickle_name = f'{func.__module__}.{func.__qualname__}'
 
         @cached_property
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            if len(dependencies) > 0:
-                hash = _hash_deps(self.config, dependencies)
-            else:
-                hash = '0'
-
-            cache_file = os.path.join(CACHE_DIR, f'{pickle_name}-{hash}.pickle')
+            cache_name = _cache_name(self, pickle_name, dependencies, files, version)
+            if cache_name in _PRELOADED:
+                return _PRELOADED[cache_name]
 
+            storage = get_storage()
             try:
-                with open(cache_file, 'rb') as f:
-                    val: R = pickle.load(f)
-                    return val
-            except FileNotFoundError:
+                val: R = storage.load(cache_name)
+                return val
+            except KeyError:
                 result = func(self, *args, **kwargs)
-                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(result, f)
+                storage.store(cache_name, result)
                 return result
 
+        wrapper.pickle_name = pickle_name
+        wrapper.dependencies = dependencies
+        wrapper.files = files
+        wrapper.version = version
+
         # register function for automatic cache generation
         module = func.__module__
         class_name, func_name = func.__qualname__.split('.')
@@ -1,5 +1,7 @@
-from typing import NamedTuple, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 from enum import Enum, auto
+from functools import lru_cache
+import re
 import string
 
 
@@ -18,23 +20,119 @@ class PunycodeAnalysisResult(NamedTuple):
     encoded: Optional[str]
 
 
-HYPHEN = ord('-')
 MAX_LABEL = 63
 MAX_NAME = 253
 CHARS_LOWER_DIGITS_HYPHEN = frozenset(string.ascii_lowercase + string.digits + '-')
 CHARS_LOWER_DIGITS_HYPHEN_DOT = frozenset(string.ascii_lowercase + string.digits + '-' + '.')
+_LDH_REGEX = re.compile('[a-z0-9-]*')
+# number of memoized encodings of non-ASCII labels
+PUNY_CACHE_SIZE = 2**16
+
+ACE_PREFIX = 'xn--'
+
+# RFC 3492 parameters
+BASE = 36
+TMIN = 1
+TMAX = 26
+SKEW = 38
+DAMP = 700
+INITIAL_BIAS = 72
+INITIAL_N = 0x80
+
+# digit values 0-35
+_DIGITS = string.ascii_lowercase + string.digits
+# (threshold, BASE - threshold) of leading digits of a variable-length integer, keyed by bias,
+# the threshold of the following digits is TMAX
+_THRESHOLDS: Dict[int, Tuple[Tuple[int, int], ...]] = {}
+
+
+def _thresholds(bias: int) -> Tuple[Tuple[int, int], ...]:
+    thresholds = _THRESHOLDS.get(bias)
+    if thresholds is None:
+        thresholds = []
+        k = BASE
+        while k < bias + TMAX:
+            t = TMIN if k <= bias else k - bias
+            thresholds.append((t, BASE - t))
+            k += BASE
+        thresholds = _THRESHOLDS[bias] = tuple(thresholds)
+    return thresholds
+
+
+def _adapt(delta: int, num_points: int, first: bool) -> int:
+    delta = delta // DAMP if first else delta // 2
+    delta += delta // num_points
+    k = 0
+    while delta > ((BASE - TMIN) * TMAX) // 2:
+        delta //= BASE - TMIN
+        k += BASE
+    return k + (BASE - TMIN + 1) * delta // (delta + SKEW)
+
+
+def punycode_encode(label: Union[str, Sequence[int]], max_length: Optional[int] = None) -> Optional[str]:
+    '''
+    Encodes a label (or its codepoints) with the RFC 3492 algorithm, like `label.encode('punycode')`.
+    Returns None as soon as the output is longer than `max_length`.
+    '''
+    codepoints = list(map(ord, label)) if isinstance(label, str) else label
+    output = [chr(cp) for cp in codepoints if cp < INITIAL_N]
+    basic_count = handled = len(output)
+    if basic_count:
+        output.append('-')
+    # every non-basic codepoint is encoded with at least one digit
+    if max_length is not None and len(output) + len(codepoints) - basic_count > max_length:
+        return None
+
+    n = INITIAL_N
+    delta = 0
+    bias = INITIAL_BIAS
+    for m in sorted(set(cp for cp in codepoints if cp >= INITIAL_N)):
+        delta += (m - n) * (handled + 1)
+        n = m
+        for cp in codepoints:
+            if cp < n:
+                delta += 1
+            elif cp == n:
+                # encode delta as a variable-length integer
+                q = delta
+                for t, base_minus_t in _thresholds(bias):
+                    if q < t:
+                        break
+                    output.append(_DIGITS[t + (q - t) % base_minus_t])
+                    q = (q - t) // base_minus_t
+                else:
+                    while q >= TMAX:
+                        output.append(_DIGITS[TMAX + (q - TMAX) % (BASE - TMAX)])
+                        q = (q - TMAX) // (BASE - TMAX)
+                output.append(_DIGITS[q])
+                if max_length is not None and len(output) > max_length:
+                    return None
+
+                bias = _adapt(delta, handled + 1, handled == basic_count)
+                delta = 0
+                handled += 1
+        delta += 1
+        n += 1
+    return ''.join(output)
 
 
 def puny_encoded_label(label: str) -> str:
     '''
     Encode a single label according to RFC 3492.
     '''
-    if not label:
+    # ASCII labels are encoded as themselves
+    if label.isascii():
         return label
-    encoded = label.encode('punycode')
-    if encoded[-1] != HYPHEN:
-        label = 'xn--' + encoded.decode('ascii')
-    return label
+    return ACE_PREFIX + punycode_encode(label)
+
+
+@lru_cache(maxsize=PUNY_CACHE_SIZE)
+def _encoded_non_ascii_label(label: str) -> Optional[str]:
+    '''
+    Lowercase encoding of the label, None if it is longer than MAX_LABEL.
+    '''
+    encoded = punycode_encode(label, max_length=MAX_LABEL - len(ACE_PREFIX))
+    return None if encoded is None else (ACE_PREFIX + encoded).lower()
 
 
 def puny_encoded(name: str) -> str:
@@ -45,30 +143,60 @@ def puny_encoded(name: str) -> str:
 
 
 def puny_analysis(name: str) -> PunycodeAnalysisResult:
+    '''
+    Checks Punycode compatibility and DNS support (see `is_rfc1123`) of the name.
+    For ASCII names both are computed in a single scan of the labels.
+    '''
     compat = PunycodeCompatibility.COMPATIBLE
     encoded = []
-    for label in name.split('.'):
-        encoded_label = puny_encoded_label(label).lower()
-        if not all(c in CHARS_LOWER_DIGITS_HYPHEN for c in encoded_label):
-            compat = PunycodeCompatibility.UNSUPPORTED_ASCII
-            break
-        if encoded_label == label:
-            if label.startswith('xn--'):
+    labels = name.split('.')
+
+    if name.isascii():
+        # a trailing dot is allowed by is_rfc1123
+        dns_labels = len(labels) - 1 if name.endswith('.') else len(labels)
+        dns_support = len(name) - (len(labels) - dns_labels) <= MAX_NAME
+    else:
+        # lowercasing may map non-ASCII characters to ASCII ones
+        dns_labels = 0
+        dns_support = is_rfc1123(name)
+
+    for i, label in enumerate(labels):
+        if label.isascii():
+            encoded_label = label.lower()
+            ldh = _LDH_REGEX.fullmatch(encoded_label) is not None
+        else:
+            # encoded lazily, only the basic (ASCII) characters are copied to the encoding
+            encoded_label = None
+            ldh = _LDH_REGEX.fullmatch(label.encode('ascii', 'ignore').decode('ascii').lower()) is not None
+        if dns_support and i < dns_labels:
+            dns_support = (ldh and
+                           not label.startswith('-') and
+                           not label.endswith('-') and
+                           len(label) <= MAX_LABEL)
+
+        if compat is PunycodeCompatibility.COMPATIBLE:
+            if not ldh:
+                compat = PunycodeCompatibility.UNSUPPORTED_ASCII
+            elif encoded_label == label and label.startswith('xn--'):
                 compat = PunycodeCompatibility.PUNYCODE_LITERAL
-                break
-            if label[2:4] == '--':
+            elif encoded_label == label and label[2:4] == '--':
                 compat = PunycodeCompatibility.INVALID_LABEL_EXTENSION
-                break
-        if len(encoded_label) > MAX_LABEL:
-            compat = PunycodeCompatibility.LABEL_TOO_LONG
+            else:
+                if encoded_label is None:
+                    encoded_label = _encoded_non_ascii_label(label)
+                if encoded_label is None or len(encoded_label) > MAX_LABEL:
+                    compat = PunycodeCompatibility.LABEL_TOO_LONG
+                else:
+                    encoded.append(encoded_label)
+        elif not dns_support or i >= dns_labels:
             break
-        encoded.append(encoded_label)
+
     encoded_name = '.'.join(encoded)
     # make sure we do not override label-level errors
     if len(encoded_name) > MAX_NAME and compat is PunycodeCompatibility.COMPATIBLE:
         compat = PunycodeCompatibility.NAME_TOO_LONG
     return PunycodeAnalysisResult(
-        dns_support=is_rfc1123(name),
+        dns_support=dns_support,
         compatibility=compat,
         encoded=encoded_name
                 if compat is PunycodeCompatibility.COMPATIBLE
@@ -76,6 +204,18 @@ def puny_analysis(name: str) -> PunycodeAnalysisResult:
     )
 
 
+def puny_analysis_batch(names: Iterable[str]) -> List[PunycodeAnalysisResult]:
+    '''
+    Works like `puny_analysis` for many names, every distinct name is analysed once.
+    '''
+    names = list(names)
+    results = {}
+    for name in names:
+        if name not in results:
+            results[name] = puny_analysis(name)
+    return [results[name] for name in names]
+
+
 '''
 From https://adraffy.github.io/punycode.js/test/demo.html
 function is_RFC1123(name) {
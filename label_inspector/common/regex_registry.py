@@ -0,0 +1,53 @@
+from typing import Callable, Dict
+import time
+
+import regex
+
+
+class RegexRegistry:
+    '''
+    Compiled regexes by name, available as attributes (`registry.simple_letter`) or items (`registry['simple_letter']`).
+    A pattern is compiled on first use and stored as a plain attribute, so later lookups are attribute reads.
+    If not lazy, all patterns are compiled in the constructor.
+    Compile times (in seconds) are kept in `timings`.
+    '''
+
+    def __init__(self, patterns: Dict[str, str], lazy: bool = True):
+        self.patterns = dict(patterns)
+        self.timings: Dict[str, float] = {}
+        if not lazy:
+            self.compile_all()
+
+    def compile_all(self):
+        for name in self.patterns:
+            getattr(self, name)
+
+    def __getattr__(self, name: str):
+        # called only for missing attributes, i.e. patterns which are not compiled yet
+        patterns = self.__dict__.get('patterns', {})
+        if name not in patterns:
+            raise AttributeError(name)
+        start = time.perf_counter()
+        compiled = regex.compile(patterns[name])
+        self.timings[name] = time.perf_counter() - start
+        setattr(self, name, compiled)
+        return compiled
+
+    def __getitem__(self, name: str):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+
+def ascii_chars_check(chars: str) -> Callable[[str], bool]:
+    '''
+    Returns a function checking if a string is non-empty and consists only of the given ASCII chars,
+    like `regex.fullmatch(f'[{chars}]+', text)` but without a regex.
+    '''
+    table = str.maketrans('', '', chars)
+
+    def check(text: str) -> bool:
+        return text != '' and text.isascii() and not text.translate(table)
+
+    return check
@@ -0,0 +1,94 @@
+'''
+Snapshot file with all cached tables of an Inspector, used for a fast warm start.
+
+Layout:
+* SNAPSHOT_MAGIC
+* format version and header length (little-endian uint32)
+* JSON header: format version, ens_normalize version, config and names of the entries
+* pickled dict of cache entries (cache file name -> value), same as the pickle_cache files
+
+The file is memory-mapped and the entries are unpickled in one pass, without copying the payload.
+'''
+
+from typing import Tuple
+from importlib.metadata import version
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+from label_inspector.common.pickle_cache import unpickle
+
+
+SNAPSHOT_MAGIC = b'LISNAPSH'
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct('<II')
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _environment() -> dict:
+    # simple confusables and normalization data depend on the ens_normalize version
+    return {
+        'version': SNAPSHOT_VERSION,
+        'ens_normalize': version('ens-normalize'),
+    }
+
+
+def write_snapshot(path: str, config: dict, entries: dict[str, object]):
+    '''
+    Writes the config and cache entries to `path`. The file is replaced atomically.
+    '''
+    header = json.dumps({**_environment(), 'config': config, 'entries': sorted(entries)}).encode('utf-8')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER.pack(SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[dict, dict[str, object]]:
+    '''
+    Returns the config and cache entries stored in a snapshot.
+    Raises SnapshotError if the file is not a snapshot or was created with an incompatible version.
+    '''
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        offset = len(SNAPSHOT_MAGIC)
+        if m[:offset] != SNAPSHOT_MAGIC:
+            raise SnapshotError(f'{path} is not an inspector snapshot')
+
+        snapshot_version, header_length = _HEADER.unpack_from(m, offset)
+        if snapshot_version != SNAPSHOT_VERSION:
+            raise SnapshotError(f'snapshot format {snapshot_version} is not supported, expected {SNAPSHOT_VERSION}')
+        offset += _HEADER.size
+
+        header = json.loads(m[offset:offset + header_length])
+        offset += header_length
+        for key, expected in _environment().items():
+            if header[key] != expected:
+                raise SnapshotError(f'snapshot was created with {key} {header[key]}, current is {expected}')
+
+        with memoryview(m) as view, view[offset:] as payload:
+            entries = unpickle(payload)
+
+    return header['config'], entries
+
+
+def main():
+    from label_inspector.config import load_inspector_config
+    from label_inspector.inspector import Inspector
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'inspector.snapshot'
+    Inspector(load_inspector_config('prod_config')).snapshot(path)
+    print(f'Snapshot written to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,23 @@
+from __future__ import annotations
 import json
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
 
 import ens_normalize.normalization
-import regex
-from omegaconf import DictConfig
 
 from label_inspector.common import myunicode
 from label_inspector.data import get_resource_path
 from label_inspector.common.pickle_cache import pickled_property
+from label_inspector.common.regex_registry import ascii_chars_check
 
 from ens_normalize import is_ens_normalized
 
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+# graphemes made of these chars are never confusable
+is_simple_grapheme = ascii_chars_check('abcdefghijklmnopqrstuvwxyz0123456789_$-')
+
+
 def uniq(l: List) -> List:
     """Return list with unique elements."""
     used = set()
@@ -82,7 +89,7 @@ class Confusables:
         return grapheme in self.confusable_graphemes
 
     def is_confusable_grapheme(self, grapheme: str) -> bool:
-        if regex.fullmatch(r'[a-z0-9_$-]+', grapheme):
+        if is_simple_grapheme(grapheme):
             return False
         
         if grapheme in self.confusable_graphemes:
@@ -1,17 +1,27 @@
 from typing import Dict, Callable, Union, List, Iterable, Optional
 from functools import cached_property
+from importlib.metadata import version
 
 import regex
-import idna
 from ens_normalize import ens_normalize, ens_beautify, ens_tokenize, is_ens_normalized, DisallowedSequence
 import unicodedata
 
 from label_inspector.common import myunicode
-from label_inspector.common.on_demand_regex import OnDemandRegex
+from label_inspector.common.regex_registry import RegexRegistry, ascii_chars_check
+from label_inspector.common.pickle_cache import cached_file
+from label_inspector.common.myunicode.columns import Columns, ColumnsWriter, Column, MAX_CODEPOINT
 from label_inspector.components.confusables import Confusables, SimpleConfusables
 from label_inspector.components.font_support import FontSupport
 
 
+LOWER = 'abcdefghijklmnopqrstuvwxyz'
+DIGITS = '0123456789'
+
+CHAR_TYPES_NAME = 'label_inspector.components.features.Features._char_types'
+# bump when the rules in Features.types_config change
+CHAR_TYPES_VERSION = 1
+
+
 class Features:
     def __init__(self, config):
         self.config = config
@@ -22,17 +32,19 @@ class Features:
         self.simple_confusables = SimpleConfusables(self.config)
         self.font_support = FontSupport(self.config)
 
+        # simple ASCII patterns are checked with ascii_chars_check
         self.regexp_patterns = {
-            'simple_letter': '^[a-z]+$',
-            'numeric': '^[0-9]+$',
-            'latin-alpha-numeric': '^[a-z0-9]+$',
-            'simple': '^[a-z0-9-]+$',
             'is_letter': r'^(\p{Ll}|\p{Lu}|\p{Lt}|\p{Lo})+$',
             'is_number': r'^\p{N}+$',
             'is_namehash': r'^\[[0-9a-f]{64}\]$',
         }
 
-        self.compiled_regexp_patterns = OnDemandRegex(self.regexp_patterns, lazy=lazy_loading)
+        self.compiled_regexp_patterns = RegexRegistry(self.regexp_patterns, lazy=lazy_loading)
+
+        self._simple_letter = ascii_chars_check(LOWER)
+        self._numeric = ascii_chars_check(DIGITS)
+        self._latin_alpha_numeric = ascii_chars_check(LOWER + DIGITS)
+        self._simple = ascii_chars_check(LOWER + DIGITS + '-')
 
         # self.classes_config: Dict[str, Callable] = {
         #     'other_letter': self.is_letter,
@@ -99,7 +111,7 @@ class Features:
 
     def simple_letter(self, label) -> bool:
         """Checks if whole string matches regular expression of lowercase Latin letters."""
-        return self.compiled_regexp_patterns['simple_letter'].match(label) is not None
+        return self._simple_letter(label)
 
     # def simple_letter_emoji(self, label) -> bool:  # TODO: slow
     #     """Checks if whole string matches regular expression of lowercase Latin letters."""
@@ -107,15 +119,15 @@ class Features:
 
     def numeric(self, label) -> bool:
         """Checks if whole string matches regular expression of Latin digits."""
-        return self.compiled_regexp_patterns['numeric'].match(label) is not None
+        return self._numeric(label)
 
     def latin_alpha_numeric(self, label) -> bool:
         """Checks if whole string matches regular expression of Latin lowercase letters or digits."""
-        return self.compiled_regexp_patterns['latin-alpha-numeric'].match(label) is not None
+        return self._latin_alpha_numeric(label)
 
     def simple(self, label) -> bool:
         """Checks if whole string matches regular expression of Latin lowercase letters or digits or hyphen."""
-        return self.compiled_regexp_patterns['simple'].match(label) is not None
+        return self._simple(label)
 
     # def is_emoji(self, label) -> bool:
     #     """Checks if whole string matches regular expression of emojis."""
@@ -128,17 +140,17 @@ class Features:
 
     def is_letter(self, label) -> bool:
         """Checks if string matches regular expression of lowercase letters."""
-        return self.compiled_regexp_patterns['is_letter'].match(label) is not None
+        return self.compiled_regexp_patterns.is_letter.match(label) is not None
 
     def simple_number(self, label) -> bool:
         """Checks if string matches regular expression of lowercase letters."""
-        return self.compiled_regexp_patterns['numeric'].match(label) is not None
+        return self._numeric(label)
 
     def is_number(self, label) -> bool:
-        return self.compiled_regexp_patterns['is_number'].match(label) is not None
+        return self.compiled_regexp_patterns.is_number.match(label) is not None
 
     def is_namehash(self, label) -> bool:
-        return self.compiled_regexp_patterns['is_namehash'].match(label) is not None
+        return self.compiled_regexp_patterns.is_namehash.match(label) is not None
 
     def script_name(self, label) -> Union[str, None]:
         """Returns name of script (writing system) of the string, None if different scripts are used in the string."""
@@ -315,14 +327,43 @@ class Features:
     #             result.append(c)
     #     return result
 
-    def type(self, label) -> str:
-        """Return classes of char: simple_letter,simple_number,other_letter,other_number,hyphen,emoji,invisible,special"""
+    def type_by_rules(self, label) -> str:
+        """Return classes of string: simple_letter,simple_number,other_letter,other_number,hyphen,emoji,invisible,special"""
         for c, func in self.types_config.items():
             if func(label):
                 return c
         return 'special'
 
+    def _write_char_types(self, f):
+        types = list(self.types_config)
+        data = {}
+        for cp in range(MAX_CODEPOINT):
+            char_type = self.type_by_rules(chr(cp))
+            if char_type != 'special':
+                data[cp] = char_type
+        writer = ColumnsWriter()
+        writer.add_column('type', data, labels=types)
+        writer.write(f)
+
+    def char_types_path(self) -> str:
+        """
+        Path of the memory-mapped table of types of all chars (computed with `type_by_rules`), created if it does not exist.
+        The regex release (as pinned in poetry.lock) is hashed, because it determines the Unicode data used by the rules.
+        """
+        return cached_file(CHAR_TYPES_NAME, self._write_char_types, version=(CHAR_TYPES_VERSION, version('regex')))
+
+    @cached_property
+    def _char_types(self) -> Column:
+        return Columns(self.char_types_path()).column('type')
+
+    def type(self, label) -> str:
+        """Return classes of char: simple_letter,simple_number,other_letter,other_number,hyphen,emoji,invisible,special"""
+        if len(label) == 1:
+            return self._char_types.get(ord(label), 'special')
+        return self.type_by_rules(label)
+
     def uts46_remap(self, name) -> Union[str, None]:
+        import idna
         try:
             uts46_remap = idna.uts46_remap(name, std3_rules=True, transitional=False)
         except idna.core.InvalidCodepoint:
@@ -330,6 +371,7 @@ class Features:
         return uts46_remap
 
     def idna_encode(self, name) -> Union[str, None]:
+        import idna
         try:
             encode = idna.encode(name, uts46=True, std3_rules=True, transitional=False)
         except idna.core.InvalidCodepoint:
@@ -1,6 +1,9 @@
 import os
-from typing import Optional
+from typing import Optional, Iterable
+from array import array
+from bisect import bisect_right
 import json
+from functools import cached_property
 
 from label_inspector.common.pickle_cache import pickled_property
 from label_inspector.data import get_resource_path
@@ -20,36 +23,152 @@ def aggregate_font_support(support_levels: list[Optional[bool]]) -> Optional[boo
     return None if unknown else True
 
 
+# font dataset combining all platforms, used for `font_support_all_os`
+ALL_OS = 'combine_all'
+
+# every platform has 2 bits in a support mask
+SUPPORTED = 0b01
+UNSUPPORTED = 0b10
+
+
+def supported_mask(platform_count: int) -> int:
+    '''
+    Mask with the supported bit set for all platforms.
+    '''
+    return int('01' * platform_count, 2) if platform_count else 0
+
+
+def support_level(mask: int, index: int) -> Optional[bool]:
+    '''
+    Support level of the platform at `index` encoded in the mask.
+    '''
+    bits = mask >> (2 * index)
+    if bits & SUPPORTED:
+        return True
+    elif bits & UNSUPPORTED:
+        return False
+    return None
+
+
+def aggregate_support_masks(masks: Iterable[int], platform_count: int) -> int:
+    '''
+    Aggregate support masks like `aggregate_font_support`, for all platforms at once.
+    Supported bits are ANDed (all supported), unsupported bits are ORed (at least one unsupported).
+    '''
+    all_supported = supported_mask(platform_count)
+    supported = all_supported
+    unsupported = 0
+    for mask in masks:
+        supported &= mask
+        unsupported |= mask
+    unsupported &= all_supported << 1
+    # unsupported takes precedence
+    return unsupported | (supported & ~(unsupported >> 1))
+
+
+def support_ranges(masks: dict[int, int]) -> tuple[array, list[int]]:
+    '''
+    Compresses codepoint support masks into ranges of equal masks.
+    Codepoints not in `masks` are unknown on all platforms (`0`).
+    '''
+    starts = array('I')
+    range_masks = []
+
+    def add(cp: int, mask: int):
+        # start a new range only if the mask changes
+        if not range_masks or range_masks[-1] != mask:
+            starts.append(cp)
+            range_masks.append(mask)
+
+    end = 0
+    for cp in sorted(masks):
+        if cp != end:
+            # gap of unknown codepoints
+            add(end, 0)
+        add(cp, masks[cp])
+        end = cp + 1
+    add(end, 0)
+    return starts, range_masks
+
+
 class FontSupport:
+    '''
+    Font support of characters and emoji on many platforms.
+    Every subdirectory of the fonts directory is a platform,
+    the support on all platforms is encoded as a bit mask (see `support_level`).
+    '''
+
     def __init__(self, config):
         self.config = config
 
-        root = os.path.join(get_resource_path(self.config.inspector.fonts), 'combine_all')
-        self.supported_chars_path = os.path.join(root, 'supported_chars.json')
-        self.supported_emoji_path = os.path.join(root, 'supported_emoji.json')
-        self.unsupported_chars_path = os.path.join(root, 'unsupported_chars.json')
-        self.unsupported_emoji_path = os.path.join(root, 'unsupported_emoji.json')
+        self.root = get_resource_path(self.config.inspector.fonts)
+        self.platforms = sorted(name for name in os.listdir(self.root)
+                                if os.path.isdir(os.path.join(self.root, name)))
+        self.all_os_index = self.platforms.index(ALL_OS)
+        # platforms with their own font datasets
+        self.individual_platforms = [platform for platform in self.platforms if platform != ALL_OS]
+        self.all_supported = supported_mask(len(self.platforms))
 
         if not config.inspector.lazy_loading:
-            self.supported
-            self.unsupported
+            self._char_support
+            self._emoji_support
+
+    def support_mask(self, char: str) -> int:
+        '''
+        Support mask of a character or an emoji on all platforms.
+        '''
+        if char == '\uFE0F':
+            return self.all_supported
+        if len(char) != 1:
+            char = char.replace('\uFE0F', '')
+            if len(char) != 1:
+                return self._emoji_support.get(char, 0)
+        starts, masks = self._char_support
+        return masks[bisect_right(starts, ord(char)) - 1]
+
+    def support_masks_many(self, chars: Iterable[str]) -> list[int]:
+        '''
+        Support masks of many single characters (e.g. all chars of a grapheme).
+        Same as `support_mask` for each element.
+        '''
+        starts, masks = self._char_support
+        return [self.all_supported if c == '\uFE0F'
+                else masks[bisect_right(starts, ord(c)) - 1] if len(c) == 1
+                else self.support_mask(c)
+                for c in chars]
+
+    def aggregate_masks(self, masks: Iterable[int]) -> int:
+        return aggregate_support_masks(masks, len(self.platforms))
 
+    def all_os_level(self, mask: int) -> Optional[bool]:
+        return support_level(mask, self.all_os_index)
 
+    def levels_by_os(self, mask: int) -> dict[str, Optional[bool]]:
+        '''
+        Support levels of individual platforms (without ALL_OS) encoded in the mask.
+        '''
+        return {platform: support_level(mask, i)
+                for i, platform in enumerate(self.platforms)
+                if i != self.all_os_index}
 
     def check_support(self, char: str) -> Optional[bool]:
         '''
-        Check if a character is supported.
+        Check if a character is supported on all platforms.
         Returns `True` if supported, `False` if unsupported, `None` if unknown.
         '''
-        if char == '\uFE0F':
-            return True
-        char = char.replace('\uFE0F', '')
-        if char in self.supported:
-            return True
-        elif char in self.unsupported:
-            return False
-        else:
-            return None
+        return self.all_os_level(self.support_mask(char))
+
+    def check_support_many(self, chars: Iterable[str]) -> list[Optional[bool]]:
+        '''
+        Same as `check_support` for each element.
+        '''
+        return [self.all_os_level(mask) for mask in self.support_masks_many(chars)]
+
+    def check_support_by_os(self, char: str) -> dict[str, Optional[bool]]:
+        '''
+        Check if a character is supported on each platform.
+        '''
+        return self.levels_by_os(self.support_mask(char))
 
     def _load_chars(self, path):
         # list of codepoints
@@ -62,26 +181,55 @@ class FontSupport:
         with open(path, 'r', encoding='utf-8') as f:
             return set(''.join(chr(cp) for cp in cps if cp != 0xFE0F) for cps in json.load(f))
 
-    @pickled_property('inspector.fonts')
-    def supported(self):
+    def _supported_set(self, platform: str = ALL_OS) -> set[str]:
+        root = os.path.join(self.root, platform)
         supported: set[str] = set()
         # add all supported
-        supported.update(self._load_chars(self.supported_chars_path))
-        supported.update(self._load_emoji(self.supported_emoji_path))
+        supported.update(self._load_chars(os.path.join(root, 'supported_chars.json')))
+        supported.update(self._load_emoji(os.path.join(root, 'supported_emoji.json')))
 
         # remove all unsupported
-        supported.difference_update(self._load_chars(self.unsupported_chars_path))
-        supported.difference_update(self._load_emoji(self.unsupported_emoji_path))
+        supported.difference_update(self._load_chars(os.path.join(root, 'unsupported_chars.json')))
+        supported.difference_update(self._load_emoji(os.path.join(root, 'unsupported_emoji.json')))
         return supported
 
-    @pickled_property('inspector.fonts')
-    def unsupported(self):
+    def _unsupported_set(self, platform: str = ALL_OS) -> set[str]:
+        root = os.path.join(self.root, platform)
         unsupported: set[str] = set()
         # add all unsupported
-        unsupported.update(self._load_chars(self.unsupported_chars_path))
-        unsupported.update(self._load_emoji(self.unsupported_emoji_path))
+        unsupported.update(self._load_chars(os.path.join(root, 'unsupported_chars.json')))
+        unsupported.update(self._load_emoji(os.path.join(root, 'unsupported_emoji.json')))
 
         # remove all supported
-        unsupported.difference_update(self._load_chars(self.supported_chars_path))
-        unsupported.difference_update(self._load_emoji(self.supported_emoji_path))
-        return unsupported
\ No newline at end of file
+        unsupported.difference_update(self._load_chars(os.path.join(root, 'supported_chars.json')))
+        unsupported.difference_update(self._load_emoji(os.path.join(root, 'supported_emoji.json')))
+        return unsupported
+
+    # shared by _char_support and _emoji_support when they are built
+    @cached_property
+    def _masks(self) -> dict[str, int]:
+        '''
+        Support masks of all known characters and emoji (without FE0F).
+        '''
+        masks = {}
+        for i, platform in enumerate(self.platforms):
+            for s in self._supported_set(platform):
+                masks[s] = masks.get(s, 0) | (SUPPORTED << (2 * i))
+            for s in self._unsupported_set(platform):
+                masks[s] = masks.get(s, 0) | (UNSUPPORTED << (2 * i))
+        return masks
+
+    @pickled_property('inspector.fonts')
+    def _char_support(self) -> tuple[array, list[int]]:
+        '''
+        Support masks of single characters as bisectable ranges:
+        codepoints from starts[i] to starts[i + 1] have masks[i].
+        '''
+        return support_ranges({ord(s): mask for s, mask in self._masks.items() if len(s) == 1})
+
+    @pickled_property('inspector.fonts')
+    def _emoji_support(self) -> dict[str, int]:
+        '''
+        Support masks of multi-character emoji (without FE0F).
+        '''
+        return {s: mask for s, mask in self._masks.items() if len(s) != 1}
@@ -1,10 +1,116 @@
 from typing import Literal
 from contextlib import contextmanager
-from hydra import initialize_config_module, compose
+from dataclasses import dataclass, asdict
+import os
+
+
+CONFIG_DIR = os.path.dirname(__file__)
+
+ConfigName = Literal["prod_config", "test_config"]
+ConfigLoader = Literal["hydra", "plain"]
+
+
+@dataclass(frozen=True)
+class _ConfigSection:
+    '''
+    Supports both `config.key` and `config['key']` access, like DictConfig.
+    '''
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+
+@dataclass(frozen=True)
+class InspectorConfig(_ConfigSection):
+    script_names: str
+    confusables: str
+    grapheme_confusables: str
+    fonts: str
+    lazy_loading: bool
+
+
+@dataclass(frozen=True)
+class AppConfig(_ConfigSection):
+    logging_level: str
+
+
+@dataclass(frozen=True)
+class LabelInspectorConfig(_ConfigSection):
+    inspector: InspectorConfig
+    app: AppConfig
+
+    @classmethod
+    def from_dict(cls, config: dict) -> 'LabelInspectorConfig':
+        return cls(
+            inspector=InspectorConfig(**config['inspector']),
+            app=AppConfig(**config['app']),
+        )
+
+
+def _read_yaml(path: str) -> dict:
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _merge(base: dict, other: dict) -> dict:
+    merged = dict(base)
+    for key, value in other.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _compose(config_name: str) -> dict:
+    '''
+    Resolves the `defaults` list of a config file the way Hydra does for the configs in this package:
+    `group: option` entries load `{group}/{option}.yaml` into `group`, `_self_` marks where the file itself is merged.
+    '''
+    config = _read_yaml(os.path.join(CONFIG_DIR, f'{config_name}.yaml'))
+    defaults = config.pop('defaults', [])
+    if '_self_' not in defaults:
+        defaults = defaults + ['_self_']
+
+    composed = {}
+    for entry in defaults:
+        if entry == '_self_':
+            composed = _merge(composed, config)
+        else:
+            (group, option), = entry.items()
+            composed = _merge(composed, {group: _read_yaml(os.path.join(CONFIG_DIR, group, f'{option}.yaml'))})
+    return composed
+
+
+def load_inspector_config(config_name: ConfigName) -> LabelInspectorConfig:
+    '''
+    Reads the config without Hydra. Produces the same `config.inspector.*` and `config.app.*` values
+    as `initialize_inspector_config` at a fraction of the startup cost.
+    '''
+    return LabelInspectorConfig.from_dict(_compose(config_name))
+
+
+def config_to_dict(config) -> dict:
+    '''
+    Converts a config created by any loader to plain dicts.
+    '''
+    if isinstance(config, LabelInspectorConfig):
+        return asdict(config)
+
+    from omegaconf import OmegaConf
+    return OmegaConf.to_container(config, resolve=True)
 
 
 @contextmanager
-def initialize_inspector_config(config_name: Literal["prod_config", "test_config"]):
+def initialize_inspector_config(config_name: ConfigName, loader: ConfigLoader = 'hydra'):
+    if loader == 'plain':
+        yield load_inspector_config(config_name)
+        return
+
+    # hydra is imported only when a config is created, it is slow to import
+    from hydra import initialize_config_module, compose
+
     with initialize_config_module(version_base=None, config_module="label_inspector.config"):
         config = compose(config_name=config_name)
         yield config
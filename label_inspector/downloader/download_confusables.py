@@ -1,8 +1,9 @@
 import collections
-import copy
+import hashlib
 import json
 import sys
 import os
+from importlib.metadata import version
 from pathlib import Path
 
 import ens_normalize
@@ -13,12 +14,16 @@ import unicodedata
 from ens_normalize import DisallowedSequence
 
 import label_inspector.common.myunicode as myunicode
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Iterable, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 
 import regex
 from tqdm import tqdm
 
 from label_inspector.common.myunicode import script_of
+from label_inspector.common.myunicode.utils import DATA_JSON_PATH
 
 LIST_OF_NONCONFUSABLES = [
     # keycaps
@@ -146,8 +151,15 @@ UNICODE_VERSION = '16.0.0'
 
 CONFUSABLES_URL = f'https://www.unicode.org/Public/security/{UNICODE_VERSION}/confusables.txt'
 
+# size of codepoint ranges processed by a single worker
+CHUNK_SIZE = 0x4000
+
 CONFUSABLES_TXT_PATH = Path(__file__).resolve().parent / 'confusables.txt'
 CONFUSABLES_JSON_PATH = Path(__file__).resolve().parent / 'confusables.json'
+# digest of the inputs used to build CONFUSABLES_JSON_PATH
+CONFUSABLES_INPUTS_PATH = Path(__file__).resolve().parent / 'confusables.inputs'
+# outputs of rule generators keyed by their inputs
+GENERATOR_CACHE_DIR = Path(__file__).resolve().parent / 'cache'
 
 
 def is_normalized(character):
@@ -169,6 +181,86 @@ def download_confusables():
         CONFUSABLES_TXT_PATH.unlink(missing_ok=True)
 
 
+def file_digest(path: Path) -> str:
+    """MD5 digest of the file contents."""
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def generator_inputs() -> Dict[str, str]:
+    """
+    Digests of the inputs of every rule generator.
+    A generator only needs to be rerun when its digest changes.
+    """
+    code = file_digest(Path(__file__))
+    ens_normalize_version = version('ens-normalize')
+    chars = hashlib.md5(
+        (code + unicodedata.unidata_version + file_digest(DATA_JSON_PATH)).encode()
+    ).hexdigest()
+    return {
+        'read_confusables_txt': hashlib.md5((code + file_digest(CONFUSABLES_TXT_PATH)).encode()).hexdigest(),
+        # also keyed by the ens-normalize version, so their outputs are rebuilt together with the post-processing
+        'custom': hashlib.md5((code + ens_normalize_version).encode()).hexdigest(),
+        'normalizations': hashlib.md5((chars + ens_normalize_version).encode()).hexdigest(),
+        'removed_accents': chars,
+        'strip_accents_nfd': chars,
+        'strip_accents_nfkd': chars,
+        # post-processing in main()
+        'ens_normalize': ens_normalize_version,
+    }
+
+
+def inputs_digest(inputs: Dict[str, str]) -> str:
+    return hashlib.md5(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def is_up_to_date(inputs: Dict[str, str]) -> bool:
+    """Checks if the previous confusables.json was built from the same inputs."""
+    try:
+        with open(CONFUSABLES_INPUTS_PATH, 'r') as f:
+            return CONFUSABLES_JSON_PATH.exists() and f.read().strip() == inputs_digest(inputs)
+    except FileNotFoundError:
+        return False
+
+
+def rules_to_json(rules: Dict[str, 'Confusable']) -> Dict[str, List[List[str]]]:
+    return {key: [c.canonical_confusables, c.noncanonical_confusables] for key, c in rules.items()}
+
+
+def rules_from_json(data: Dict[str, List[List[str]]]) -> Dict[str, 'Confusable']:
+    rules = collections.defaultdict(lambda: Confusable())
+    for key, (canonical, noncanonical) in data.items():
+        rules[key].canonical_confusables = canonical
+        rules[key].noncanonical_confusables = noncanonical
+    return rules
+
+
+def cached_generator(generator: Callable, inputs_hash: str) -> Callable:
+    """
+    Wraps a rule generator to store its output in GENERATOR_CACHE_DIR.
+    The output is reused as long as the generator inputs do not change.
+    """
+    cache_file = GENERATOR_CACHE_DIR / f'{generator.__name__}-{inputs_hash}.json'
+
+    def wrapper(*args, **kwargs) -> Dict[str, Confusable]:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                print(f'Reusing {cache_file.name}')
+                return rules_from_json(json.load(f))
+        except FileNotFoundError:
+            rules = generator(*args, **kwargs)
+            os.makedirs(GENERATOR_CACHE_DIR, exist_ok=True)
+            # an interrupted run must not leave a truncated file to be reused later
+            tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(rules_to_json(rules), f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+            return rules
+
+    wrapper.__name__ = generator.__name__
+    return wrapper
+
+
 def hex_to_char(hex_string: str) -> str:
     """Convert hex string to character (e.g. '0061' to 'a')."""
     return chr(int(hex_string, 16))
@@ -215,9 +307,15 @@ class Confusable:
             if confusable not in self.all_confusables():
                 self.noncanonical_confusables.append(confusable)
 
-    def extend_noncanonical(self, confusables: List[str]):
+    def extend_noncanonical(self, confusables: Iterable[str]):
+        """Same as append_noncanonical for every confusable, but checks membership in a set."""
+        members = set(self.all_confusables())
         for confusable in confusables:
-            self.append_noncanonical(confusable)
+            if SIMPLE.match(confusable):
+                self.set_canonical_if_not_set(confusable)
+            elif confusable not in members:
+                self.noncanonical_confusables.append(confusable)
+            members.add(confusable)
 
     def extend_potential_canonical(self, confusables: List[str]):
         for confusable in confusables:
@@ -287,16 +385,20 @@ def custom() -> Dict[str, Confusable]:
     return rules
 
 
-def normalizations() -> Dict[str, Confusable]:
-    """Create confusable rules by normalizations."""
-    upto = sys.maxunicode + 1
+def normalizations_chunk(start: int, stop: int) -> Dict[str, List[List[str]]]:
+    """Create confusable rules by normalizations for codepoints in [start, stop)."""
     rules = collections.defaultdict(lambda: Confusable())
-    for i in range(0, upto):
+    for i in range(start, stop):
         char = chr(i)
         variants = uniq_filter(all_variants(char))
         if len(variants) > 1 or (len(variants) == 1 and variants[0] != char):
             rules[char].extend_noncanonical(variants)
-    return rules
+    return rules_to_json(rules)
+
+
+def normalizations(executor: Executor = None) -> Dict[str, Confusable]:
+    """Create confusable rules by normalizations."""
+    return map_all_chars(executor, normalizations_chunk)
 
 
 def all_variants(s: str) -> List[str]:
@@ -317,11 +419,34 @@ def remove_accents(input_str):
     return u"".join([c for c in nfkd_form if not myunicode.combining(c)])
 
 
-def apply_all_chars(func: Callable, noncanonical=True) -> Dict[str, Confusable]:
-    """Applies a transformation for every Unicode char."""
-    upto = sys.maxunicode + 1
+def codepoint_chunks(upto: int = sys.maxunicode + 1, size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Split the codepoint space into [start, stop) ranges."""
+    return [(start, min(start + size, upto)) for start in range(0, upto, size)]
+
+
+def map_all_chars(executor: Optional[Executor], chunk_func: Callable, *args) -> Dict[str, Confusable]:
+    """
+    Runs chunk_func(*args, start, stop) for every chunk of the codepoint space,
+    in the executor if given, and merges the results in codepoint order.
+    """
+    chunks = codepoint_chunks()
+    if executor is None:
+        results = (chunk_func(*args, start, stop) for start, stop in chunks)
+    else:
+        # submit all chunks before waiting for the results
+        futures = [executor.submit(chunk_func, *args, start, stop) for start, stop in chunks]
+        results = (future.result() for future in futures)
+
+    merged = {}
+    for result in results:
+        merged.update(result)
+    return rules_from_json(merged)
+
+
+def apply_chars(func: Callable, noncanonical: bool, start: int, stop: int) -> Dict[str, List[List[str]]]:
+    """Applies a transformation for every Unicode char in [start, stop)."""
     rules = collections.defaultdict(lambda: Confusable())
-    for i in range(0, upto):
+    for i in range(start, stop):
         char = chr(i)
         stripped = func(char)
         variants = uniq_filter([stripped] + all_variants(stripped))
@@ -330,11 +455,19 @@ def apply_all_chars(func: Callable, noncanonical=True) -> Dict[str, Confusable]:
                 rules[char].extend_noncanonical(variants)
             else:
                 rules[char].extend_potential_canonical(variants)
-    return rules
+    return rules_to_json(rules)
 
 
-def removed_accents() -> Dict[str, Confusable]:
-    return apply_all_chars(remove_accents, noncanonical=False)
+def apply_all_chars(func: Callable, noncanonical=True, executor: Executor = None) -> Dict[str, Confusable]:
+    """
+    Applies a transformation for every Unicode char.
+    func must be picklable (defined at module level) if executor is given.
+    """
+    return map_all_chars(executor, apply_chars, func, noncanonical)
+
+
+def removed_accents(executor: Executor = None) -> Dict[str, Confusable]:
+    return apply_all_chars(remove_accents, noncanonical=False, executor=executor)
 
 
 def strip_accents(s: str, categories=('Mn',), n='NFD') -> str:
@@ -343,14 +476,29 @@ def strip_accents(s: str, categories=('Mn',), n='NFD') -> str:
                    if myunicode.category(c) not in categories)
 
 
-def strip_accents_nfd() -> Dict[str, Confusable]:
-    return apply_all_chars(lambda x: strip_accents(x, n='NFD', categories=['Mn']), noncanonical=False)
+def strip_accents_nfd_char(s: str) -> str:
+    return strip_accents(s, n='NFD', categories=['Mn'])
+
 
+def strip_accents_nfkd_char(s: str) -> str:
+    return strip_accents(s, n='NFKD', categories=['Mn', 'Zs', 'Nd', 'Sm', 'Po', 'Lm', 'Lo', 'Mc', 'So'])
 
-def strip_accents_nfkd() -> Dict[str, Confusable]:
-    return apply_all_chars(
-        lambda x: strip_accents(x, n='NFKD', categories=['Mn', 'Zs', 'Nd', 'Sm', 'Po', 'Lm', 'Lo', 'Mc', 'So']),
-        noncanonical=False)
+
+def strip_accents_nfd(executor: Executor = None) -> Dict[str, Confusable]:
+    return apply_all_chars(strip_accents_nfd_char, noncanonical=False, executor=executor)
+
+
+def strip_accents_nfkd(executor: Executor = None) -> Dict[str, Confusable]:
+    return apply_all_chars(strip_accents_nfkd_char, noncanonical=False, executor=executor)
+
+
+# generators which scan the whole codepoint space and accept an executor
+CODEPOINT_GENERATORS = (
+    normalizations,
+    removed_accents,
+    strip_accents_nfd,
+    strip_accents_nfkd,
+)
 
 
 def reorder(l: List[str]) -> List[str]:
@@ -382,31 +530,32 @@ def forward_backward_transitive(rules: Dict[str, Confusable]) -> Dict[str, Confu
             if key == v: continue
             reversed_c[v].append(key)
 
-    new_rules = copy.deepcopy(rules)
-
+    # every key only extends its own confusables, which are read before the loop,
+    # so the rules can be updated in place
     for key, confusable in tqdm(rules.items(), desc='Backward transitive'):
-        for v in confusable.all_confusables():
-            if key == v: continue
-            new_rules[key].extend_noncanonical(reversed_c[v])
-            # print(f'extend_noncanonical {key} -> {v} so {key} -> {reversed_c[v]}')
-    return new_rules
+        confusable.extend_noncanonical(chain.from_iterable(
+            reversed_c[v] for v in confusable.all_confusables() if key != v
+        ))
+    return rules
 
 
 def symmetric(rules: Dict[str, Confusable]) -> Dict[str, Confusable]:
     """Augments confusable rules. If the rules are: a->b then b->a."""
-    # new_rules = collections.defaultdict(list)
-    # new_rules.update(rules)
-    new_rules = copy.deepcopy(rules)
-    for key, confusable in tqdm(rules.items(), desc='Symmetric'):
-        # new_rules[v].append_potential_canonical(v)
+    # group keys by the confusable they point to (in the order of the rules),
+    # so that every confusable is extended once
+    reversed_c = collections.defaultdict(list)
+    for key, confusable in rules.items():
         for v in confusable.all_confusables():
             if key == v: continue
-            if key not in new_rules[v].all_confusables():
+            reversed_c[v].append(key)
+
+    for v, keys in tqdm(reversed_c.items(), desc='Symmetric'):
+        existing = set(rules[v].all_confusables())
+        for key in uniq(keys):
+            if key not in existing:
                 print(f'symmetric {key} -> {v} so {v} -> {key}')
-            new_rules[v].append_noncanonical(key)
-            # if new_rules[v].canonical is None:
-            #     logging.warning(f'No canonical for {v}, adding confusable {key} {v == key}')
-    return new_rules
+        rules[v].extend_noncanonical(keys)
+    return rules
 
 
 class Confusables():
@@ -417,7 +566,13 @@ class Confusables():
         # join rules
         self.rules: Dict[str, Confusable] = collections.defaultdict(lambda: Confusable())
 
-    def generate(self):
+    def generate(self, inputs: Dict[str, str] = None, workers: int = None):
+        """
+        Runs all rule generators and post-processes the rules.
+        If `inputs` (see `generator_inputs`) are given, generator outputs are cached.
+        Codepoint generators run concurrently in `workers` processes (all cores by default),
+        their outputs are merged in the order of rule_generators.
+        """
         rule_generators = [
             read_confusables_txt,
             custom,
@@ -427,8 +582,20 @@ class Confusables():
             strip_accents_nfkd,
         ]
 
-        for rule_generator in rule_generators:
-            self.run_generator(rule_generator)
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                ThreadPoolExecutor(max_workers=len(rule_generators)) as threads:
+            outputs = []
+            for rule_generator in rule_generators:
+                run = rule_generator
+                if inputs is not None:
+                    run = cached_generator(run, inputs[rule_generator.__name__])
+                if rule_generator in CODEPOINT_GENERATORS:
+                    run = partial(run, executor=executor)
+                # threads only wait for the chunks submitted to the process pool
+                outputs.append(threads.submit(run))
+
+            for rule_generator, output in zip(rule_generators, outputs):
+                self.run_generator(rule_generator, output.result())
 
         uniq_and_reorder(self.rules)
         # json.dump(rules, open('c.json', 'w'), ensure_ascii=False, indent=2, sort_keys=True)
@@ -454,25 +621,28 @@ class Confusables():
         uniq_and_reorder(self.rules)
 
     def set_canonical_to_itself(self):
-        new_rules = copy.deepcopy(self.rules)
-        for key, confusable in new_rules.items():
+        snapshot = [(key, confusable.all_confusables()) for key, confusable in self.rules.items()]
+        for key, confusables in snapshot:
             self.rules[key].set_canonical_if_not_set(key)
-            for a_confusable in confusable.all_confusables():
+            for a_confusable in confusables:
                 if a_confusable not in self.rules:
                     self.rules[a_confusable].append_potential_canonical(a_confusable)
                     print(f'{key} -> {a_confusable}, so for {a_confusable} canonical is {a_confusable}')
 
-    def run_generator(self, generator: Callable):
-        c_other = generator()
+    def run_generator(self, generator: Callable, c_other: Dict[str, Confusable] = None):
+        if c_other is None:
+            c_other = generator()
         for key, confusable in c_other.items():
             if key not in self.rules:
                 print(f'{generator.__name__} {key} {confusable.canonical_confusables} {confusable.noncanonical_confusables}')
             
-            copied = copy.deepcopy(self.rules[key])    
+            canonical_before = list(self.rules[key].canonical_confusables)
+            noncanonical_before = list(self.rules[key].noncanonical_confusables)
             self.rules[key].update(confusable)
-            if copied != self.rules[key]:
+            if canonical_before != self.rules[key].canonical_confusables \
+                    or noncanonical_before != self.rules[key].noncanonical_confusables:
                 print(
-                    f'{generator.__name__} {key} {copied.canonical_confusables} {copied.noncanonical_confusables} {self.rules[key].canonical_confusables} {self.rules[key].noncanonical_confusables}')
+                    f'{generator.__name__} {key} {canonical_before} {noncanonical_before} {self.rules[key].canonical_confusables} {self.rules[key].noncanonical_confusables}')
 
         print('added:', len(c_other), 'uniq:', len(self.rules))
 
@@ -505,12 +675,17 @@ class Confusables():
             self.rules[grapheme].set_canonical(grapheme)
 
 
-if __name__ == '__main__':
+def main():
     print('Downloading confusables...')
     with download_confusables():
+        inputs = generator_inputs()
+        if is_up_to_date(inputs):
+            print(f'Confusables are up to date {CONFUSABLES_JSON_PATH}')
+            return
+
         print('Processing confusables...')
         confusables = Confusables()
-        confusables.generate()
+        confusables.generate(inputs)
 
         confusables.check()
 
@@ -555,4 +730,10 @@ if __name__ == '__main__':
 
         print(f'Saving confusables... {CONFUSABLES_JSON_PATH}')
         confusables.save(CONFUSABLES_JSON_PATH)
+        with open(CONFUSABLES_INPUTS_PATH, 'w') as f:
+            f.write(inputs_digest(inputs))
         print('Done')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,29 @@
+from __future__ import annotations
 import unicodedata
-from omegaconf import DictConfig
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, Iterable, List, Optional, TYPE_CHECKING
 
-from label_inspector.config import initialize_config_module
-from label_inspector.common import myunicode
+from label_inspector.config import initialize_inspector_config, config_to_dict, LabelInspectorConfig
+from label_inspector.common import myunicode, pickle_cache, snapshot
+from label_inspector.common.myunicode.data import MY_UNICODE_DATA
 from label_inspector.components.features import Features
-from label_inspector.analysis.label_analysis import LabelAnalysis, LabelAnalysisConfig
+from label_inspector.components.font_support import aggregate_font_support
+from label_inspector.analysis.label_analysis import LabelAnalysis, LabelAnalysisConfig, aggregate_scripts
+from label_inspector.analysis.confusable_risk import confusable_risk, ConfusableRiskResult
+from label_inspector.analysis.label_verdict import label_verdict, LabelVerdict
+from label_inspector.common.punycode import puny_analysis
 from label_inspector.models import (
     InspectorResultNormalized,
     InspectorResultUnnormalized,
     InspectorResult,
+    InspectorNameResult,
 )
 
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
 
 def remove_accents(input_str: str) -> str:
     nfkd_form = unicodedata.normalize('NFKD', input_str)
@@ -22,10 +35,96 @@ def strip_accents(s: str) -> str:
                    if myunicode.category(c) != 'Mn')
 
 
+# number of label results memoized by analyse_name, e.g. for common parents like `eth`
+LABEL_CACHE_SIZE = 1024
+# longer labels are not memoized, their results are large and rarely repeated
+CACHED_LABEL_LENGTH = 64
+
+# inspector of a worker process of analyse_names
+_WORKER_INSPECTOR: Optional[Inspector] = None
+
+
+def _init_worker(config: dict):
+    global _WORKER_INSPECTOR
+    _WORKER_INSPECTOR = Inspector(LabelInspectorConfig.from_dict(config))
+
+
+def _analyse_label_in_worker(label: str, options: dict) -> InspectorResult:
+    return _WORKER_INSPECTOR.analyse_label(label, **options)
+
+
+class _LabelCache:
+    '''
+    Thread-safe LRU cache of label results, which can be filled with results computed elsewhere (e.g. by workers).
+    '''
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, InspectorResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[InspectorResult]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: InspectorResult):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+
 class Inspector:
     def __init__(self, config: DictConfig):
         self.config = config
         self.f = Features(config)
+        self._label_cache = _LabelCache(LABEL_CACHE_SIZE)
+        self._executor = None
+        self._executor_workers = None
+        # guards the pool, analyse_names may run in concurrent threads (e.g. web API requests)
+        self._executor_lock = threading.Lock()
+
+    def _cached_objects(self) -> list:
+        return [MY_UNICODE_DATA, self.f.full_confusables, self.f.simple_confusables, self.f.font_support]
+
+    def _cached_files(self) -> List[str]:
+        '''
+        Paths of the memory-mapped files (see `pickle_cache.cached_file`) used by the inspector.
+        '''
+        return [MY_UNICODE_DATA.columns_path(), self.f.char_types_path()]
+
+    def snapshot(self, path: str):
+        '''
+        Writes the config and all cached tables and files of the inspector to a single snapshot file.
+        '''
+        entries = {}
+        for obj in self._cached_objects():
+            entries.update(pickle_cache.cache_entries(obj))
+        entries.update(pickle_cache.file_entries(self._cached_files()))
+        snapshot.write_snapshot(path, config_to_dict(self.config), entries)
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> Inspector:
+        '''
+        Creates an inspector from a file written by `snapshot`, with all tables loaded.
+        Memory-mapped files missing from the cache storage are written from the snapshot.
+        '''
+        config, entries = snapshot.read_snapshot(path)
+        pickle_cache.preload(entries)
+        inspector = cls(LabelInspectorConfig.from_dict(config))
+        inspector._cached_files()
+        for obj in inspector._cached_objects():
+            pickle_cache.cache_entries(obj)
+        return inspector
 
     def analyse_label(self, label: str,
                       truncate_confusables: int = None,
@@ -33,6 +132,10 @@ class Inspector:
                       truncate_chars: int = None,
                       simple_confusables: bool = False,
                       omit_cure: bool = False,
+                      cure_max_iterations: int = None,
+                      cure_timeout: float = None,
+                      long_label: int = None,
+                      long_label_graphemes: int = None,
                       ) -> InspectorResult:
         config = LabelAnalysisConfig(
             label,
@@ -41,6 +144,10 @@ class Inspector:
             truncate_chars=truncate_chars,
             simple_confusables=simple_confusables,
             omit_cure=omit_cure,
+            cure_max_iterations=cure_max_iterations,
+            cure_timeout=cure_timeout,
+            long_label=long_label,
+            long_label_graphemes=long_label_graphemes,
         )
 
         label_analysis = LabelAnalysis(self, config)
@@ -51,9 +158,113 @@ class Inspector:
         else:
             return InspectorResultUnnormalized(**result)
 
+    def _analyse_labels(self, labels: List[str], options: dict, workers: int) -> Dict[str, InspectorResult]:
+        '''
+        Analyses distinct labels, short labels are memoized.
+        Labels missing from the cache run in `workers` processes if there are many.
+        '''
+        options_key = tuple(sorted(options.items()))
+        results = {}
+        pending = []
+        for label in labels:
+            result = self._label_cache.get((label, options_key)) if len(label) <= CACHED_LABEL_LENGTH else None
+            if result is None:
+                pending.append(label)
+            else:
+                results[label] = result
+
+        if workers > 1 and len(pending) > 1:
+            chunksize = max(1, len(pending) // (4 * workers))
+            # map submits all tasks before returning, so the pool cannot be shut down in between
+            with self._executor_lock:
+                analysed = self._get_executor(workers).map(_analyse_label_in_worker, pending, [options] * len(pending),
+                                                           chunksize=chunksize)
+        else:
+            analysed = (self.analyse_label(label, **options) for label in pending)
+
+        for label, result in zip(pending, analysed):
+            results[label] = result
+            if len(label) <= CACHED_LABEL_LENGTH:
+                self._label_cache.put((label, options_key), result)
+        return results
+
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        '''
+        Returns the pool with `workers` processes, expects `_executor_lock` to be held.
+        '''
+        if self._executor is None or self._executor_workers != workers:
+            self._shutdown_executor()
+            self._executor = ProcessPoolExecutor(max_workers=workers,
+                                                 initializer=_init_worker,
+                                                 initargs=(config_to_dict(self.config),))
+            self._executor_workers = workers
+        return self._executor
+
+    def close(self):
+        '''
+        Stops the worker processes of analyse_names, after they finish the submitted labels.
+        '''
+        with self._executor_lock:
+            self._shutdown_executor()
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            # waits for the submitted tasks, results of running map calls stay available
+            self._executor.shutdown()
+            self._executor = None
+
+    def analyse_names(self, names: Iterable[str], workers: int = 1, **options) -> List[InspectorNameResult]:
+        '''
+        Analyses names split on dots, every distinct label is analysed once (see `analyse_label` for options).
+        Short labels (e.g. `eth`) are memoized across calls.
+        With `workers` > 1, labels which are not memoized are analysed in a pool of worker processes,
+        which is kept for later calls.
+        '''
+        names = list(names)
+        labels = list(dict.fromkeys(label for name in names for label in name.split('.')))
+        results = self._analyse_labels(labels, options, workers)
+        return [self._name_result(name, [results[label] for label in name.split('.')]) for name in names]
+
+    def analyse_name(self, name: str, **options) -> InspectorNameResult:
+        '''
+        Analyses every label of a name (split on dots) and aggregates the results.
+        Takes the same options as `analyse_label`.
+        '''
+        return self.analyse_names([name], **options)[0]
+
+    def _name_result(self, name: str, labels: List[InspectorResult]) -> InspectorNameResult:
+        normalized = all(label.status == 'normalized' for label in labels)
+        normalized_labels = [label.label if label.status == 'normalized' else label.normalized_label
+                             for label in labels]
+        any_scripts = sorted({script for label in labels for script in label.any_scripts})
+        punycode = puny_analysis(name)
+        return InspectorNameResult(
+            name=name,
+            status='normalized' if normalized else 'unnormalized',
+            label_count=len(labels),
+            labels=labels,
+            normalized_name=None if None in normalized_labels else '.'.join(normalized_labels),
+            confusable_count=sum(label.confusable_count for label in labels),
+            all_script=aggregate_scripts(any_scripts),
+            any_scripts=any_scripts,
+            dns_hostname_support=punycode.dns_support,
+            punycode_compatibility=punycode.compatibility.name,
+            punycode_encoding=punycode.encoded,
+            font_support_all_os=aggregate_font_support([label.font_support_all_os for label in labels]),
+        )
+
+    def confusable_risk(self, label: str,
+                        threshold: Optional[int] = None,
+                        simple_confusables: bool = False,
+                        ) -> ConfusableRiskResult:
+        return confusable_risk(self, label, threshold=threshold, simple=simple_confusables)
+
+    def label_verdict(self, label: str, simple_confusables: bool = False) -> LabelVerdict:
+        return label_verdict(self, label, simple=simple_confusables)
+
 
 def main():
-    with initialize_config_module('prod_config') as config:
+    with initialize_inspector_config('prod_config') as config:
         print('Unicode version', unicodedata.unidata_version)
 
         labels = ['🅜🅜🅜', 'ന്‌മ', 'a‌b.eth', '1a〆.eth', 'аррӏе.eth', 'as', '.', 'ASD', 'Bloß.de', 'xn--0.pt', 'u¨.com',
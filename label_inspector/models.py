@@ -1,8 +1,21 @@
-from typing import Optional, List, Union
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Union
+from pydantic import BaseModel, Field, SerializerFunctionWrapHandler, model_serializer
 from ens_normalize import DisallowedSequenceType, CurableSequenceType, NormalizableSequenceType
 
 
+class FontSupportByOsResult(BaseModel):
+    """
+    Omits `font_support_by_os` if there are no font datasets of individual operating systems.
+    """
+
+    @model_serializer(mode='wrap')
+    def _omit_font_support_by_os(self, handler: SerializerFunctionWrapHandler) -> dict:
+        data = handler(self)
+        if data.get('font_support_by_os', {}) is None:
+            del data['font_support_by_os']
+        return data
+
+
 class InspectorRequestBase(BaseModel):
     truncate_confusables: Optional[int] = Field(
         default=None,
@@ -31,6 +44,31 @@ class InspectorRequestBase(BaseModel):
         description="Limit `confusables_other` and `confusables_canonical` fields output to confusables that are single-grapheme and ENSIP-15 normalized.\n"
                     "* this option affects the earliest stage of confusable generation and impacts all confusable-related fields"
     )
+    omit_cure: bool = Field(
+        default=False,
+        description="Skip curing of unnormalized labels, `cured_label` is `null` and `cure_status` is `OMITTED`.")
+    cure_max_iterations: Optional[int] = Field(
+        default=100,
+        ge=1,
+        description="Maximum number of normalization passes when curing an unnormalized label. Each pass removes one disallowed sequence.\n"
+                    "* if `null` then the number of passes is not limited\n"
+                    "* if the limit is reached then `cured_label` is `null` and `cure_status` is `ITERATION_LIMIT`")
+    cure_timeout: Optional[float] = Field(
+        default=0.1,
+        gt=0,
+        description="Time limit in seconds for curing an unnormalized label, checked between normalization passes.\n"
+                    "* if `null` then the time is not limited\n"
+                    "* if the limit is reached then `cured_label` is `null` and `cure_status` is `TIME_LIMIT`")
+    long_label: Optional[int] = Field(
+        default=500,
+        ge=0,
+        description="Labels with more characters are analysed in the `summary` tier (see `analysis_tier`).\n"
+                    "* if `null` then the number of characters does not limit the analysis")
+    long_label_graphemes: Optional[int] = Field(
+        default=250,
+        ge=0,
+        description="Labels with more graphemes are analysed in the `summary` tier (see `analysis_tier`).\n"
+                    "* if `null` then the number of graphemes does not limit the analysis")
 
 
 class InspectorSingleRequest(InspectorRequestBase):
@@ -41,6 +79,41 @@ class InspectorBatchRequest(InspectorRequestBase):
     labels: List[str] = Field(description='Batch of input labels.')
 
 
+class InspectorNameRequest(InspectorRequestBase):
+    name: str = Field(description='Input name, labels are separated by dots (e.g. `sub.vitalik.eth`).')
+
+
+class InspectorNameBatchRequest(InspectorRequestBase):
+    names: List[str] = Field(description='Batch of input names.')
+
+
+class InspectorConfusableRiskRequest(BaseModel):
+    label: str = Field(description='Input label.')
+    threshold: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Stop the computation as soon as the score exceeds this value.\n"
+                    "* if `null` (default value) then the whole label is scored\n"
+                    "* if the threshold is exceeded then `exceeded` is `true` and the other fields are lower bounds")
+    simple_confusables: bool = Field(
+        default=False,
+        description="Only consider confusables that are single-grapheme and ENSIP-15 normalized (see `simple_confusables` in the main endpoint).")
+
+
+class InspectorSafeRequest(BaseModel):
+    label: str = Field(description='Input label.')
+    simple_confusables: bool = Field(
+        default=False,
+        description="Only consider confusables that are single-grapheme and ENSIP-15 normalized (see `simple_confusables` in the main endpoint).")
+
+
+class InspectorSafeBatchRequest(BaseModel):
+    labels: List[str] = Field(description='Batch of input labels.')
+    simple_confusables: bool = Field(
+        default=False,
+        description="Only consider confusables that are single-grapheme and ENSIP-15 normalized (see `simple_confusables` in the main endpoint).")
+
+
 class InspectorCharResult(BaseModel):
     value: str = Field(description="Character being inspected.")
     script: str = Field(description="Script name (writing system) of the character.\n"
@@ -67,7 +140,7 @@ class InspectorCharResult(BaseModel):
                                                         "* `null` if the character is not assigned to any version")
 
 
-class InspectorGraphemeResult(BaseModel):
+class InspectorGraphemeResult(FontSupportByOsResult):
     value: str = Field(description="The grapheme string.")
     chars: List[InspectorCharResult] = Field(description="List of characters. May be shorter than `value` (grapheme string) if `truncate_chars` applies")
     name: str = Field(description="Name of the grapheme.\n"
@@ -100,6 +173,13 @@ class InspectorGraphemeResult(BaseModel):
                     "* `null` - it is unknown whether the grapheme is supported or not"
     )
 
+    font_support_by_os: Optional[Dict[str, Optional[bool]]] = Field(
+        default=None,
+        description="Whether the grapheme is supported by the default sets of fonts on each operating system with a font dataset.\n"
+                    "* values have the same meaning as in `font_support_all_os`\n"
+                    "* omitted if there are no font datasets of individual operating systems"
+    )
+
     description: str = Field(description="Description of the grapheme type.")
 
     unicode_version: Optional[str] = Field(description="Unicode Version of the grapheme.\n"
@@ -129,7 +209,7 @@ class InspectorGraphemeWithConfusablesResult(InspectorGraphemeResult):
                           "* if `simple_confusables` is enabled then only single-grapheme normalized confusables are returned")
 
 
-class InspectorResultBase(BaseModel):
+class InspectorResultBase(FontSupportByOsResult):
     label: str = Field(description="Input label.")
 
     status: str = Field(description="Status of the input label.\n"
@@ -138,6 +218,12 @@ class InspectorResultBase(BaseModel):
 
     version: str = Field(default='0.2.0', description="Version of the label inspector.")
 
+    analysis_tier: str = Field(
+        description="Depth of the analysis.\n"
+                    "* `full` - all fields are computed\n"
+                    "* `summary` - the label exceeds `long_label` or `long_label_graphemes`, `graphemes` is an empty list, "
+                    "aggregates, normalization and Punycode fields are computed as usual")
+
     char_length: int = Field(
         description="Number of Unicode UTF-32 codepoints in the input label. Might be larger than the number of graphemes.")
 
@@ -166,7 +252,8 @@ class InspectorResultBase(BaseModel):
     confusable_count: int = Field(description='Number of graphemes that are confusable.')
 
     graphemes: List[InspectorGraphemeWithConfusablesResult] = Field(
-        description="List of graphemes in the input label. May be shorter than `grapheme_length` if `truncate_graphemes` is enabled.")
+        description="List of graphemes in the input label. May be shorter than `grapheme_length` if `truncate_graphemes` is enabled.\n"
+                    "* empty in the `summary` tier (see `analysis_tier`)")
 
     canonical_label: Optional[str] = Field(
         description='Input label where all confusables are replaced with their canonicals.\n'
@@ -209,6 +296,13 @@ class InspectorResultBase(BaseModel):
                     "* `null` - at least one grapheme is unknown and zero graphemes are known not to be supported"
     )
 
+    font_support_by_os: Optional[Dict[str, Optional[bool]]] = Field(
+        default=None,
+        description="Whether all graphemes in the label are supported by the default sets of fonts on each operating system with a font dataset.\n"
+                    "* values have the same meaning as in `font_support_all_os`\n"
+                    "* omitted if there are no font datasets of individual operating systems"
+    )
+
 
 class InspectorResultNormalized(InspectorResultBase):
     beautiful_label: str = Field(description="ENSIP-15 beautified version of the input label.")
@@ -221,7 +315,15 @@ class InspectorResultUnnormalized(InspectorResultBase):
 
     cured_label: Optional[str] = Field(
         description='ENSIP-15 normalized input label where all disallowed characters are removed.\n'
-                    'Is `null` if the label cannot be cured.')
+                    'Is `null` if the label cannot be cured or curing was skipped (see `cure_status`).')
+
+    cure_status: str = Field(
+        description='Result of curing the input label.\n'
+                    '* `CURED` - the label was cured, see `cured_label`\n'
+                    '* `UNCURABLE` - the label contains a disallowed sequence that cannot be removed\n'
+                    '* `OMITTED` - curing was skipped (`omit_cure`)\n'
+                    '* `ITERATION_LIMIT` - curing stopped after `cure_max_iterations` normalization passes\n'
+                    '* `TIME_LIMIT` - curing stopped after `cure_timeout` seconds')
 
     normalization_error_message: str = Field(description='Reason why the input label is not normalized.')
 
@@ -256,3 +358,93 @@ InspectorResult = Union[InspectorResultNormalized, InspectorResultUnnormalized]
 
 class InspectorBatchResult(BaseModel):
     results: List[InspectorResult] = Field(description="List of results for each input label.")
+
+
+class InspectorNameResult(BaseModel):
+    name: str = Field(description="Input name.")
+
+    status: str = Field(description="Status of the input name.\n"
+                                    "* `normalized` - if all labels are normalized\n"
+                                    "* `unnormalized` - if any label is unnormalized")
+
+    label_count: int = Field(description="Number of labels in the name (separated by dots).")
+
+    labels: List[InspectorResult] = Field(description="Results for each label of the name, in order.")
+
+    normalized_name: Optional[str] = Field(
+        description='Input name with every label run through ENSIP-15 normalization.\n'
+                    'Is `null` if any label cannot be normalized.')
+
+    confusable_count: int = Field(description="Number of confusable graphemes in all labels.")
+
+    all_script: Optional[str] = Field(
+        description="Script of all graphemes of all labels, see `all_script` of the label results.")
+
+    any_scripts: List[str] = Field(description="List of unique script names of all graphemes of all labels.")
+
+    dns_hostname_support: bool = Field(
+        description='Whether the input name is a valid DNS hostname according to RFC 1123, including the name limit of 253 characters.')
+
+    punycode_compatibility: str = Field(
+        description='Whether the input name is compatible with Punycode (RFC 3492), see `punycode_compatibility` of the label results.\n'
+                    '* `NAME_TOO_LONG` - the Punycode encoded name exceeds 253 characters')
+
+    punycode_encoding: Optional[str] = Field(
+        description='Punycode (RFC 3492) encoded version of the input name.\n'
+                    'Is `null` if the input name is not compatible with Punycode (see `punycode_compatibility`).')
+
+    font_support_all_os: Optional[bool] = Field(
+        description="Whether all graphemes of all labels are supported by the default sets of fonts on common operating systems.\n"
+                    "* values have the same meaning as in `font_support_all_os` of the label results")
+
+
+class InspectorNameBatchResult(BaseModel):
+    results: List[InspectorNameResult] = Field(description="List of results for each input name.")
+
+
+class InspectorConfusableRiskResult(BaseModel):
+    label: str = Field(description="Input label.")
+
+    score: int = Field(
+        description="Confusability score of the label. The score is a sum of:\n"
+                    "* `1` for every confusable grapheme\n"
+                    "* `1` for every confusable grapheme without a canonical\n"
+                    "* `2` if the label has many scripts (`all_script` is `null`)")
+
+    confusable_count: int = Field(description="Number of graphemes that are confusable.")
+
+    canonical_exists: bool = Field(description="Whether all confusable graphemes have a canonical.")
+
+    mixed_script: bool = Field(description="Whether the label has many scripts or a grapheme with `Unknown`/`Combined` script.")
+
+    exceeded: bool = Field(description="Whether the score exceeded `threshold` and the computation was stopped early.")
+
+
+class InspectorSafeResult(BaseModel):
+    label: str = Field(description="Input label.")
+
+    safe: bool = Field(
+        description="Whether the label is normalized, has no confusable graphemes, has a single script "
+                    "and is not known to be unsupported by fonts (`font_support_all_os` is not `false`).")
+
+    normalized: bool = Field(description="Whether `status` of the label is `normalized`.")
+
+    confusable_count: int = Field(description="Number of graphemes that are confusable (same as in the main endpoint).")
+
+    single_script: bool = Field(description="Whether `all_script` of the label is not `null`.")
+
+    font_support_all_os: Optional[bool] = Field(
+        description="Same as `font_support_all_os` in the main endpoint.")
+
+
+class InspectorSafeBatchResult(BaseModel):
+    """
+    Results of the batch as arrays, the i-th element of every array is the result of the i-th label.
+    """
+
+    labels: List[str] = Field(description="Input labels.")
+    safe: List[bool] = Field(description="`safe` of every label (see `/safe`).")
+    normalized: List[bool] = Field(description="`normalized` of every label (see `/safe`).")
+    confusable_count: List[int] = Field(description="`confusable_count` of every label (see `/safe`).")
+    single_script: List[bool] = Field(description="`single_script` of every label (see `/safe`).")
+    font_support_all_os: List[Optional[bool]] = Field(description="`font_support_all_os` of every label (see `/safe`).")
@@ -1,10 +1,38 @@
+import json
 import logging
-from typing import List
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Response
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:
+    # optional (the msgpack extra), MessagePack responses are offered only if installed
+    msgpack = None
 
 from label_inspector.config import initialize_inspector_config
 from label_inspector.inspector import Inspector
-from label_inspector.models import InspectorSingleRequest, InspectorBatchRequest, InspectorResult, InspectorBatchResult
+from label_inspector.analysis.label_verdict import LabelVerdict
+from label_inspector.common.columnar import to_columns
+from label_inspector.models import (
+    InspectorSingleRequest,
+    InspectorBatchRequest,
+    InspectorResult,
+    InspectorBatchResult,
+    InspectorConfusableRiskRequest,
+    InspectorConfusableRiskResult,
+    InspectorRequestBase,
+    InspectorNameRequest,
+    InspectorNameBatchRequest,
+    InspectorNameResult,
+    InspectorNameBatchResult,
+    InspectorSafeRequest,
+    InspectorSafeBatchRequest,
+    InspectorSafeResult,
+    InspectorSafeBatchResult,
+)
 
 
 logger = logging.getLogger('label_inspector')
@@ -12,29 +40,139 @@ stream_handler = logging.StreamHandler()
 stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logger.addHandler(stream_handler)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # stop the worker processes of /name/batch
+    inspector.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def set_logging_level(level: str):
+    logger.setLevel(level)
+    for handler in logger.handlers:
+        handler.setLevel(level)
+
+
+# 'plain' reads the YAML config directly, 'hydra' composes it with Hydra
+CONFIG_LOADER = os.environ.get('INSPECTOR_CONFIG_LOADER', 'plain')
+
+# path to a file written by Inspector.snapshot, used instead of the config if set
+SNAPSHOT_PATH = os.environ.get('INSPECTOR_SNAPSHOT')
+
+# number of processes analysing labels of batch name requests
+WORKERS = int(os.environ.get('INSPECTOR_WORKERS', '1'))
 
 
 def init_inspector():
-    with initialize_inspector_config('prod_config') as config:
-        logger.setLevel(config.app.logging_level)
-        for handler in logger.handlers:
-            handler.setLevel(config.app.logging_level)
+    if SNAPSHOT_PATH:
+        inspector = Inspector.from_snapshot(SNAPSHOT_PATH)
+        set_logging_level(inspector.config.app.logging_level)
+        return inspector
+
+    with initialize_inspector_config('prod_config', loader=CONFIG_LOADER) as config:
+        set_logging_level(config.app.logging_level)
         return Inspector(config)
 
 
 inspector = init_inspector()
 
 
-def analyse_label(label: str, request_body: InspectorSingleRequest) -> InspectorResult:
-    result = inspector.analyse_label(
-        label,
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+# results as a document of label_inspector.common.columnar
+COLUMNAR_JSON_MEDIA_TYPE = 'application/vnd.namehash.columnar+json'
+COLUMNAR_MSGPACK_MEDIA_TYPE = 'application/vnd.namehash.columnar+msgpack'
+
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE)
+COLUMNAR_MEDIA_TYPES = (COLUMNAR_JSON_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE)
+
+# media types of batch responses, in order of preference
+BATCH_MEDIA_TYPES = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, COLUMNAR_JSON_MEDIA_TYPE, COLUMNAR_MSGPACK_MEDIA_TYPE]
+# results of /safe/batch are already columnar
+SAFE_BATCH_MEDIA_TYPES = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+
+
+def _accept_quality(accept: dict, media_type: str) -> float:
+    main_type = media_type.split('/')[0]
+    for key in (media_type, f'{main_type}/*', '*/*'):
+        if key in accept:
+            return accept[key]
+    return 0.0
+
+
+def negotiate_media_type(accept: Optional[str], media_types: List[str]) -> Optional[str]:
+    '''
+    Returns the media type with the highest quality in the Accept header (the first one for equal qualities),
+    None if none of them is acceptable. Media types requiring msgpack are skipped if it is not installed.
+    '''
+    if msgpack is None:
+        media_types = [media_type for media_type in media_types if media_type not in MSGPACK_MEDIA_TYPES]
+    if not accept:
+        return media_types[0]
+
+    qualities = {}
+    for item in accept.split(','):
+        media_type, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.lower()] = quality
+
+    best = max(media_types, key=lambda media_type: _accept_quality(qualities, media_type))
+    return best if _accept_quality(qualities, best) > 0 else None
+
+
+def batch_media_type(accept: Optional[str], media_types: List[str]) -> str:
+    media_type = negotiate_media_type(accept, media_types)
+    if media_type is None:
+        raise HTTPException(status_code=406, detail=f'Acceptable media types: {", ".join(media_types)}')
+    return media_type
+
+
+def encode_batch(result: BaseModel, media_type: str) -> Response:
+    '''
+    Serializes the batch result with pydantic, bypassing the generic (much slower) serialization of FastAPI.
+    Columnar media types encode `results` of the batch (see label_inspector.common.columnar).
+    '''
+    if media_type == JSON_MEDIA_TYPE:
+        return Response(result.model_dump_json(), media_type=media_type)
+
+    content = result.model_dump(mode='json')
+    if media_type in COLUMNAR_MEDIA_TYPES:
+        content = to_columns(content['results'])
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return Response(msgpack.packb(content), media_type=media_type)
+    return Response(json.dumps(content, ensure_ascii=False, separators=(',', ':')), media_type=media_type)
+
+
+def batch_responses(media_types: List[str]) -> dict:
+    return {200: {'content': {media_type: {} for media_type in media_types if media_type != JSON_MEDIA_TYPE}}}
+
+
+def analysis_options(request_body: InspectorRequestBase) -> dict:
+    return dict(
         truncate_confusables=request_body.truncate_confusables,
         truncate_graphemes=request_body.truncate_graphemes,
         truncate_chars=request_body.truncate_chars,
         simple_confusables=request_body.simple_confusables,
+        omit_cure=request_body.omit_cure,
+        cure_max_iterations=request_body.cure_max_iterations,
+        cure_timeout=request_body.cure_timeout,
+        long_label=request_body.long_label,
+        long_label_graphemes=request_body.long_label_graphemes,
     )
-    return result
+
+
+def analyse_label(label: str, request_body: InspectorRequestBase) -> InspectorResult:
+    return inspector.analyse_label(label, **analysis_options(request_body))
 
 
 @app.post("/")
@@ -42,7 +180,50 @@ async def single_endpoint(request_body: InspectorSingleRequest) -> InspectorResu
     return analyse_label(request_body.label, request_body)
 
 
-@app.post("/batch")
-async def batch_endpoint(request_body: InspectorBatchRequest) -> InspectorBatchResult:
+@app.post("/batch", response_model=InspectorBatchResult, responses=batch_responses(BATCH_MEDIA_TYPES))
+async def batch_endpoint(request_body: InspectorBatchRequest, accept: Optional[str] = Header(default=None)):
+    media_type = batch_media_type(accept, BATCH_MEDIA_TYPES)
     results = [analyse_label(label, request_body) for label in request_body.labels]
-    return InspectorBatchResult(results=results)
+    return encode_batch(InspectorBatchResult(results=results), media_type)
+
+
+# not async, analyses wait for the worker processes and run in the threadpool
+@app.post("/name")
+def name_endpoint(request_body: InspectorNameRequest) -> InspectorNameResult:
+    return inspector.analyse_name(request_body.name, **analysis_options(request_body))
+
+
+@app.post("/name/batch", response_model=InspectorNameBatchResult, responses=batch_responses(BATCH_MEDIA_TYPES))
+def name_batch_endpoint(request_body: InspectorNameBatchRequest, accept: Optional[str] = Header(default=None)):
+    media_type = batch_media_type(accept, BATCH_MEDIA_TYPES)
+    results = inspector.analyse_names(request_body.names, workers=WORKERS, **analysis_options(request_body))
+    return encode_batch(InspectorNameBatchResult(results=results), media_type)
+
+
+@app.post("/confusable-risk")
+async def confusable_risk_endpoint(request_body: InspectorConfusableRiskRequest) -> InspectorConfusableRiskResult:
+    result = inspector.confusable_risk(
+        request_body.label,
+        threshold=request_body.threshold,
+        simple_confusables=request_body.simple_confusables,
+    )
+    return InspectorConfusableRiskResult(label=request_body.label, **result._asdict())
+
+
+@app.post("/safe")
+async def safe_endpoint(request_body: InspectorSafeRequest) -> InspectorSafeResult:
+    verdict = inspector.label_verdict(request_body.label, simple_confusables=request_body.simple_confusables)
+    return InspectorSafeResult(label=request_body.label, **verdict._asdict())
+
+
+@app.post("/safe/batch", response_model=InspectorSafeBatchResult, responses=batch_responses(SAFE_BATCH_MEDIA_TYPES))
+async def safe_batch_endpoint(request_body: InspectorSafeBatchRequest, accept: Optional[str] = Header(default=None)):
+    media_type = batch_media_type(accept, SAFE_BATCH_MEDIA_TYPES)
+    verdicts = [inspector.label_verdict(label, simple_confusables=request_body.simple_confusables)
+                for label in request_body.labels]
+    # one array per field
+    result = InspectorSafeBatchResult(
+        labels=request_body.labels,
+        **{name: [getattr(verdict, name) for verdict in verdicts] for name in LabelVerdict._fields},
+    )
+    return encode_batch(result, media_type)
@@ -24,6 +24,7 @@ BASE_RESPONSE_FIELDS = [
     'label',
     'status',
     'version',
+    'analysis_tier',
     'char_length',
     'grapheme_length',
     'all_type',
@@ -48,6 +49,7 @@ NORMALIZED_RESPONSE_FIELDS = [
 UNNORMALIZED_RESPONSE_FIELDS = [
     'normalized_label',
     'cured_label',
+    'cure_status',
     'normalization_error_message',
     'normalization_error_details',
     'normalization_error_code',
@@ -75,6 +77,9 @@ def check_inspector_base_response(label,
     assert is_type(resp['all_script'], str, NoneType)
     assert is_type(resp['any_scripts'], list)
     assert is_type(resp['confusable_count'], int)
+    assert resp['analysis_tier'] in ['full', 'summary']
+    if resp['analysis_tier'] == 'summary':
+        assert resp['graphemes'] == []
 
     # check returned characters
     # the order of the characters must match the input label
@@ -195,11 +200,15 @@ def check_inspector_unnormalized_response(label,
     assert sorted(resp.keys()) == sorted(BASE_RESPONSE_FIELDS + UNNORMALIZED_RESPONSE_FIELDS)
 
     assert resp['label'] == label
-    try:
-        cured = ens_cure(label)
-    except DisallowedSequence:
-        cured = None
-    assert resp['cured_label'] == cured
+    assert resp['cure_status'] in ['CURED', 'UNCURABLE', 'OMITTED', 'ITERATION_LIMIT', 'TIME_LIMIT']
+    if resp['cure_status'] in ['CURED', 'UNCURABLE']:
+        try:
+            cured = ens_cure(label)
+        except DisallowedSequence:
+            cured = None
+        assert resp['cured_label'] == cured
+    else:
+        assert resp['cured_label'] is None
     assert resp['status'] == 'unnormalized'
     assert VERSION_REGEX.match(resp['version'])
     res = ens_process(label, do_normalizations=True)
@@ -0,0 +1,52 @@
+import sys
+import argparse
+import subprocess
+import statistics
+
+
+HEAVY_MODULES = ['hydra', 'omegaconf', 'idna', 'emoji', 'ens_normalize', 'fastapi']
+
+SCRIPT = '''
+import sys
+from time import perf_counter
+start = perf_counter()
+import {module}
+imported = perf_counter()
+loaded = ','.join(m for m in {heavy!r} if m in sys.modules)
+{after_import}
+done = perf_counter()
+print(imported - start, done - imported, loaded)
+'''
+
+FIRST_LABEL = '''
+from label_inspector.config import initialize_inspector_config
+from label_inspector.inspector import Inspector
+with initialize_inspector_config('prod_config') as config:
+    Inspector(config).analyse_label('nick')
+'''
+
+
+def measure(module: str, first_label: bool):
+    script = SCRIPT.format(module=module,
+                           after_import=FIRST_LABEL if first_label else '',
+                           heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), float(out[1]), out[2] if len(out) > 2 else ''
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure import time of a module in fresh interpreters')
+    parser.add_argument('-m', '--module', default='label_inspector.inspector', help='Module to import')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Number of fresh interpreters')
+    parser.add_argument('--first-label', action='store_true', help='Also measure the first analyse_label call')
+    args = parser.parse_args()
+
+    results = [measure(args.module, args.first_label) for _ in range(args.repeat)]
+    import_times = [r[0] for r in results]
+    print(f'import {args.module}: median {statistics.median(import_times) * 1000:.0f} ms, '
+          f'min {min(import_times) * 1000:.0f} ms')
+    if args.first_label:
+        label_times = [r[1] for r in results]
+        print(f'first label: median {statistics.median(label_times) * 1000:.0f} ms, '
+              f'min {min(label_times) * 1000:.0f} ms')
+    print(f'heavy modules loaded by the import: {results[0][2] or "none"}')
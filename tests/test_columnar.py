@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from label_inspector.common.columnar import to_columns, from_columns
+
+
+@pytest.mark.parametrize('values', [
+    [],
+    [None, 1, 2.5, True],
+    ['Latin', 'Greek', 'Latin', None],
+    [1, 'a', None],
+    [{'a': 1, 'b': 'x'}, {'b': 'y'}, None, {}],
+    [[1], [], None, [2, 3]],
+    [{'chars': [{'name': 'A', 'script': 'Latin'}, {'name': 'B', 'script': 'Latin'}]}, {'chars': None}],
+    [{'by_os': {}}, {'by_os': {'WINDOWS': True}}],
+])
+def test_columnar_round_trip(values):
+    document = json.loads(json.dumps(to_columns(values)))
+    assert from_columns(document) == values
+
+
+def test_columnar_interns_strings():
+    values = [{'script': 'Latin', 'type': 'simple_letter'}] * 100 + [{'script': 'Greek', 'type': 'simple_letter'}]
+    document = to_columns(values)
+    assert document['length'] == 101
+    assert sorted(document['strings']) == ['Greek', 'Latin', 'simple_letter']
+    assert document['columns']['fields']['script']['indices'][-2:] == [0, 1]
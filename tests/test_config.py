@@ -0,0 +1,38 @@
+import dataclasses
+import subprocess
+import sys
+
+import pytest
+from omegaconf import OmegaConf
+
+from label_inspector.common import pickle_cache
+from label_inspector.config import initialize_inspector_config, load_inspector_config
+
+
+@pytest.mark.parametrize('config_name', ['prod_config', 'test_config'])
+def test_plain_config_matches_hydra(config_name):
+    plain = load_inspector_config(config_name)
+    with initialize_inspector_config(config_name) as config:
+        assert dataclasses.asdict(plain) == OmegaConf.to_container(config)
+        # pickle cache files must be shared between both loaders
+        keys = ['inspector.confusables', 'inspector.fonts', 'inspector.lazy_loading']
+        assert pickle_cache._hash_deps(plain, keys) == pickle_cache._hash_deps(config, keys)
+
+
+def test_plain_config_access():
+    with initialize_inspector_config('prod_config', loader='plain') as config:
+        assert config.inspector.lazy_loading is True
+        assert config['inspector']['fonts'] == config.inspector.fonts
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.app.logging_level = 'DEBUG'
+
+
+def test_plain_config_does_not_import_hydra():
+    script = '\n'.join([
+        'import sys',
+        'from label_inspector.config import load_inspector_config',
+        'load_inspector_config("prod_config")',
+        'print(sorted(m for m in ("hydra", "omegaconf") if m in sys.modules))',
+    ])
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
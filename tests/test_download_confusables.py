@@ -0,0 +1,75 @@
+import collections
+
+import pytest
+
+pytest.importorskip('requests')
+
+from label_inspector.downloader import download_confusables as dc
+
+
+def make_rules(pairs):
+    rules = collections.defaultdict(dc.Confusable)
+    for key, confusable in pairs:
+        rules[key].append_potential_canonical(confusable)
+    return rules
+
+
+def test_rule_expansion():
+    confusables = dc.Confusables()
+    confusables.rules = make_rules([('α', 'ξ'), ('β', 'ξ'), ('γ', 'ψ'), ('δ', 'ψ'), ('δ', 'o')])
+
+    confusables.set_canonical_to_itself()
+    confusables.rules = dc.forward_backward_transitive(confusables.rules)
+    confusables.rules = dc.symmetric(confusables.rules)
+    dc.uniq_and_reorder(confusables.rules)
+    confusables.check()
+
+    # the expansion is not transitive: γ is not confused with o
+    assert {k: v.to_json() for k, v in confusables.rules.items()} == {
+        'o': ['o', ['δ']],
+        'α': ['ξ', ['β']],
+        'β': ['ξ', ['α']],
+        'γ': ['ψ', ['δ']],
+        'δ': ['ψ', ['o', 'γ']],
+        'ξ': ['ξ', ['α', 'β']],
+        'ψ': ['ψ', ['γ', 'δ']],
+    }
+
+
+def test_extend_noncanonical():
+    confusable = dc.Confusable()
+    confusable.append_potential_canonical('ξ')
+    confusable.extend_noncanonical(['α', 'a', 'α', 'ξ', 'β', 'a'])
+    assert confusable.canonical_confusables == ['ξ', 'a']
+    assert confusable.noncanonical_confusables == ['α', 'β']
+
+
+def test_generator_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(dc, 'GENERATOR_CACHE_DIR', tmp_path)
+    generator = dc.cached_generator(dc.custom, 'test')
+    assert dc.rules_to_json(generator()) == dc.rules_to_json(dc.custom())
+    assert (tmp_path / 'custom-test.json').exists()
+    assert dc.rules_to_json(generator()) == dc.rules_to_json(dc.custom())
+
+
+def test_generator_inputs_ens_normalize_version(monkeypatch):
+    monkeypatch.setattr(dc, 'file_digest', lambda path: 'digest')
+    monkeypatch.setattr(dc, 'version', lambda name: '3.0.0')
+    old = dc.generator_inputs()
+    monkeypatch.setattr(dc, 'version', lambda name: '3.0.1')
+    new = dc.generator_inputs()
+    assert old['custom'] != new['custom']
+    assert old['normalizations'] != new['normalizations']
+    assert old['read_confusables_txt'] == new['read_confusables_txt']
+
+
+def test_generator_cache_interrupted(tmp_path, monkeypatch):
+    monkeypatch.setattr(dc, 'GENERATOR_CACHE_DIR', tmp_path)
+
+    def failing_dump(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(dc.json, 'dump', failing_dump)
+    with pytest.raises(KeyboardInterrupt):
+        dc.cached_generator(dc.custom, 'test')()
+    assert not (tmp_path / 'custom-test.json').exists()
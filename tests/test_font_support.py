@@ -1,6 +1,19 @@
+import os
+import json
+
+from omegaconf import OmegaConf
+
 from label_inspector.config import initialize_inspector_config
 from label_inspector.components.font_support import aggregate_font_support
-from label_inspector.components.font_support import FontSupport
+from label_inspector.components.font_support import (
+    FontSupport,
+    support_ranges,
+    support_level,
+    aggregate_support_masks,
+    SUPPORTED,
+    UNSUPPORTED,
+)
+from label_inspector.common import pickle_cache
 
 
 def test_agg():
@@ -17,3 +30,72 @@ def test_fe0f():
         assert fs.check_support("🤹‍♀") is True
         assert fs.check_support("🤹‍♀️") is True
         assert fs.check_support("\uFE0F") is True
+
+
+def test_support_ranges():
+    assert list(support_ranges({})[0]) == [0]
+    starts, masks = support_ranges({0: 1, 1: 1, 2: 2, 5: 2, 6: 2, 8: 1})
+    assert list(starts) == [0, 2, 3, 5, 7, 8, 9]
+    assert masks == [1, 2, 0, 2, 0, 1, 0]
+
+
+def test_agg_masks():
+    # platform 0: supported, platform 1: unsupported, platform 2: unknown
+    mask = SUPPORTED | (UNSUPPORTED << 2)
+    assert support_level(mask, 0) is True
+    assert support_level(mask, 1) is False
+    assert support_level(mask, 2) is None
+
+    for levels in [[True, True, True], [True, True, False], [True, True, None], [True, False, None], [False, False, None], []]:
+        masks = [SUPPORTED if level else UNSUPPORTED if level is False else 0 for level in levels]
+        assert support_level(aggregate_support_masks(masks, 1), 0) is aggregate_font_support(levels)
+
+
+def write_platform(root, platform, supported_chars, unsupported_chars, supported_emoji=(), unsupported_emoji=()):
+    os.makedirs(root / platform)
+    for name, data in [('supported_chars', supported_chars), ('unsupported_chars', unsupported_chars),
+                       ('supported_emoji', supported_emoji), ('unsupported_emoji', unsupported_emoji)]:
+        with open(root / platform / f'{name}.json', 'w') as f:
+            json.dump([ord(c) for c in data] if 'chars' in name else [[ord(c) for c in e] for e in data], f)
+
+
+def test_font_support_by_os(tmp_path, monkeypatch):
+    monkeypatch.setattr(pickle_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    fonts = tmp_path / 'fonts'
+    write_platform(fonts, 'combine_all', 'a', 'bc', [], ['🤹‍♀'])
+    write_platform(fonts, 'linux', 'ab', 'c', ['🤹‍♀'], [])
+    write_platform(fonts, 'macos', 'a', 'b', [], ['🤹‍♀'])
+    config = OmegaConf.create({'inspector': {'fonts': str(fonts), 'lazy_loading': True}})
+
+    fs = FontSupport(config)
+    assert fs.platforms == ['combine_all', 'linux', 'macos']
+    assert fs.individual_platforms == ['linux', 'macos']
+    assert fs.check_support('a') is True
+    assert fs.check_support('b') is False
+    assert fs.check_support_by_os('a') == {'linux': True, 'macos': True}
+    assert fs.check_support_by_os('b') == {'linux': True, 'macos': False}
+    assert fs.check_support_by_os('c') == {'linux': False, 'macos': None}
+    assert fs.check_support_by_os('d') == {'linux': None, 'macos': None}
+    assert fs.check_support_by_os('🤹‍♀️') == {'linux': True, 'macos': False}
+    assert fs.levels_by_os(fs.aggregate_masks(fs.support_masks_many('ab'))) == {'linux': True, 'macos': False}
+    assert fs.levels_by_os(fs.aggregate_masks(fs.support_masks_many('ad'))) == {'linux': None, 'macos': None}
+
+
+def test_check_support_matches_sets():
+    with initialize_inspector_config("prod_config") as config:
+        fs = FontSupport(config)
+        supported = fs._supported_set()
+        unsupported = fs._unsupported_set()
+        assert all(fs.check_support(c) is True for c in supported)
+        assert all(fs.check_support(c) is False for c in unsupported)
+        assert fs.check_support('\U0010FFFF') is None
+        assert fs.check_support('ab') is None
+
+
+def test_check_support_many():
+    with initialize_inspector_config("prod_config") as config:
+        fs = FontSupport(config)
+        chars = ['a', '\uFE0F', '\U0010FFFF', '🤹‍♀️', 'ą']
+        assert fs.check_support_many(chars) == [fs.check_support(c) for c in chars]
+        # only the combined dataset is available
+        assert fs.check_support_by_os('a') == {}
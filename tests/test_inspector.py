@@ -1,9 +1,18 @@
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import pytest
 import os
 
 from label_inspector.config import initialize_inspector_config
 from label_inspector.components.features import Features
 from label_inspector.inspector import Inspector, remove_accents, strip_accents
+from label_inspector.common import pickle_cache
+from label_inspector.common.snapshot import SnapshotError
+import label_inspector.common.myunicode.data
+import label_inspector.inspector
+import label_inspector.analysis.label_analysis
 from helpers import TESTS_DATA_PATH
 
 
@@ -23,6 +32,18 @@ def test_inspector_character_name():
         assert f.unicodeblock('🧽') == 'Supplemental Symbols and Pictographs'
 
 
+def test_features_type_table():
+    with initialize_inspector_config("prod_config") as config:
+        f = Features(config)
+        # the regex rules are the reference for the precomputed table
+        for cp in list(range(0x3400)) + list(range(0x3400, 0x110000, 97)):
+            assert f.type(chr(cp)) == f.type_by_rules(chr(cp))
+        assert f.type('a') == 'simple_letter'
+        assert f.type('\u200d') == 'invisible'
+        assert f.type('😀') == 'special'
+        assert f.type('ab') == 'simple_letter'
+
+
 def test_remove_accents():
     chars = {'ą': 'a', 'ś': 's', 'ó': 'o', 'ź': 'z', 'ώ': 'ω', 'ῴ': 'ω'}
     # {'ł':'l','ό':'o'} dont work
@@ -36,6 +57,99 @@ def test_inspector_long(analyse_label):
     analyse_label('miinibaashkiminasiganibiitoosijiganibadagwiingweshiganibakwezhigan')
 
 
+def test_inspector_analyse_name():
+    with initialize_inspector_config("prod_config") as config:
+        inspector = Inspector(config)
+        result = inspector.analyse_name('sub.ąlaptop.eth')
+        assert result.label_count == 3
+        assert [label.label for label in result.labels] == ['sub', 'ąlaptop', 'eth']
+        assert result.status == 'normalized'
+        assert result.normalized_name == 'sub.ąlaptop.eth'
+        assert result.confusable_count == inspector.analyse_label('ąlaptop').confusable_count
+        assert result.all_script == 'Latin'
+        assert result.punycode_encoding == 'sub.xn--' + 'ąlaptop'.encode('punycode').decode() + '.eth'
+
+        result = inspector.analyse_name('a b.eth')
+        assert result.status == 'unnormalized'
+        assert result.normalized_name is None
+
+        # parent labels are reused
+        hits = inspector._label_cache.hits
+        results = inspector.analyse_names(['x.eth', 'y.eth'])
+        assert results[0].labels[1] is results[1].labels[1]
+        assert inspector._label_cache.hits == hits + 1
+
+
+def test_inspector_analyse_names_workers():
+    with initialize_inspector_config("prod_config") as config:
+        inspector = Inspector(config)
+        names = ['ą' * 70 + '.eth', 'b' * 70 + '.eth', 'ą' * 70 + '.eth']
+        try:
+            parallel = inspector.analyse_names(names, workers=2)
+        finally:
+            inspector.close()
+        assert [r.model_dump() for r in parallel] == [r.model_dump() for r in inspector.analyse_names(names)]
+
+
+def test_inspector_analyse_names_workers_short_labels():
+    with initialize_inspector_config("prod_config") as config:
+        inspector = Inspector(config)
+        names = ['nick.eth', 'vitalik.eth', 'ąlaptop.eth']
+        try:
+            parallel = inspector.analyse_names(names, workers=2)
+            # the labels were not memoized, so they were analysed by the pool
+            assert inspector._executor is not None
+        finally:
+            inspector.close()
+        assert inspector._label_cache.hits == 0
+
+        # results of the workers are memoized
+        serial = inspector.analyse_names(names)
+        assert inspector._label_cache.hits == 4
+        assert [r.model_dump() for r in parallel] == [r.model_dump() for r in serial]
+
+
+class _FakePool:
+    """Runs tasks in the calling thread, slow to start so that concurrent callers race."""
+    instances = []
+
+    def __init__(self, max_workers, initializer, initargs):
+        time.sleep(0.05)
+        self.is_shutdown = False
+        _FakePool.instances.append(self)
+
+    def map(self, fn, *iterables, chunksize=1):
+        if self.is_shutdown:
+            raise RuntimeError('cannot schedule new futures after shutdown')
+        return list(map(fn, *iterables))
+
+    def shutdown(self):
+        self.is_shutdown = True
+
+
+def test_inspector_analyse_names_workers_threads(monkeypatch):
+    with initialize_inspector_config("prod_config") as config:
+        inspector = Inspector(config)
+        monkeypatch.setattr(label_inspector.inspector, 'ProcessPoolExecutor', _FakePool)
+        monkeypatch.setattr(label_inspector.inspector, '_WORKER_INSPECTOR', inspector)
+        monkeypatch.setattr(_FakePool, 'instances', [])
+        names = [[f'a{i}.eth', f'b{i}.eth'] for i in range(8)]
+
+        def analyse(i):
+            if i % 4 == 3:
+                inspector.close()
+            # different worker counts replace the pool while other threads use it
+            return inspector.analyse_names(names[i], workers=2 + i % 2)
+
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            parallel = list(threads.map(analyse, range(8)))
+        inspector.close()
+        # no pool was leaked
+        assert all(pool.is_shutdown for pool in _FakePool.instances)
+        for i, results in enumerate(parallel):
+            assert [r.model_dump() for r in results] == [r.model_dump() for r in inspector.analyse_names(names[i])]
+
+
 def test_inspector_cured_label(analyse_label):
     input = 'a a'
     r = analyse_label(input, omit_cure=False)
@@ -43,12 +157,63 @@ def test_inspector_cured_label(analyse_label):
     r = analyse_label(input, omit_cure=True)
     assert r['cured_label'] is None
 
+
+def test_inspector_ens_process_shared(analyse_label):
+    from label_inspector.analysis.normalization import _memoized_ens_process as cached_ens_process
+    cached_ens_process.cache_clear()
+    # the canonical label equals the input
+    r = analyse_label('vitalik')
+    assert r['normalized_canonical_label'] == 'vitalik'
+    assert cached_ens_process.cache_info().misses == 1
+    analyse_label('vitalik')
+    assert cached_ens_process.cache_info().misses == 1
+    # nothing to cure
+    r = analyse_label('Vitalik', omit_cure=False)
+    assert r['cured_label'] == 'vitalik'
+    assert cached_ens_process.cache_info().misses == 2
+    # long labels are not memoized
+    analyse_label('vitalik' * 10)
+    assert cached_ens_process.cache_info().currsize == 2
+
+
+def test_cure_cache_threads(monkeypatch):
+    from label_inspector.analysis import normalization
+    monkeypatch.setattr(normalization, 'ENS_PROCESS_CACHE_SIZE', 4)
+    monkeypatch.setattr(normalization, '_CURE_CACHE', normalization.OrderedDict())
+    texts = [f'a{i} a' for i in range(200)]
+    # threads evict the same entries
+    with ThreadPoolExecutor(max_workers=8) as threads:
+        results = list(threads.map(normalization.cure, texts))
+    assert [r.cured for r in results] == [f'a{i}a' for i in range(200)]
+    assert len(normalization._CURE_CACHE) == 4
+
+
 @pytest.mark.execution_timeout(2)
 def test_inspector_cured_label_long(analyse_label):
     input = '⎛⎝⎞⎠' * 1000
     r = analyse_label(input, omit_cure=True)
     assert r['cured_label'] is None
 
+
+def test_inspector_analysis_tier(analyse_label, monkeypatch):
+    label = 'ąlaptop😀' * 10
+    full = analyse_label(label)
+    assert full['analysis_tier'] == 'full'
+    assert len(full['graphemes']) == 80
+
+    # the summary tier does not build grapheme analyses
+    monkeypatch.setattr(label_inspector.analysis.label_analysis, 'GraphemeWithConfusablesAnalysis', None)
+    for kwargs in [{'long_label': 79}, {'long_label_graphemes': 79}]:
+        summary = analyse_label(label, **kwargs)
+        assert summary['analysis_tier'] == 'summary'
+        assert summary['graphemes'] == []
+        del summary['analysis_tier'], summary['graphemes']
+        assert summary == {key: full[key] for key in summary}
+
+    monkeypatch.undo()
+    assert analyse_label(label, long_label=80)['analysis_tier'] == 'full'
+
+
 @pytest.mark.execution_timeout(10)
 def test_inspector_long2(analyse_label):
     analyse_label('a' * 40000)
@@ -453,3 +618,111 @@ def test_unicode_null_version(analyse_label):
     assert result['graphemes'][0]['unicode_version'] == '1.1'
     assert result['graphemes'][0]['chars'][0]['unicode_version'] is None
     assert result['graphemes'][0]['chars'][1]['unicode_version'] == '1.1'
+
+
+@pytest.fixture(scope="module")
+def inspector():
+    with initialize_inspector_config("prod_config") as config:
+        return Inspector(config)
+
+
+@pytest.mark.parametrize('label', ['laptop', 'ąlaptop', 'yéś', '˪pure-words', 'pаypаl', 'аррӏе', '🧟‍♂🧟‍♂', ''])
+def test_confusable_risk_matches_analysis(inspector, analyse_label, label):
+    result = analyse_label(label)
+    risk = inspector.confusable_risk(label)
+    assert risk.confusable_count == result['confusable_count']
+    assert risk.canonical_exists == (result['canonical_label'] is not None)
+    assert risk.mixed_script == (result['all_script'] is None and label != '')
+    assert not risk.exceeded
+
+
+def test_confusable_risk_threshold(inspector):
+    label = 'ąęśćź' * 10
+    full = inspector.confusable_risk(label)
+    assert full.confusable_count == 50
+    assert not full.exceeded
+
+    risk = inspector.confusable_risk(label, threshold=3)
+    assert risk.exceeded
+    assert risk.score == 4
+    assert risk.confusable_count == 4
+
+    assert not inspector.confusable_risk(label, threshold=full.score).exceeded
+
+
+@pytest.mark.parametrize('label', ['laptop', 'ąlaptop', 'Laptop', 'pаypаl', '🧟‍♂🧟‍♂', '😀🏻ć9漢$ć', 'a\u0328', 'ab\ufe0f', ''])
+@pytest.mark.parametrize('simple', [False, True])
+def test_label_verdict_matches_analysis(inspector, label, simple):
+    result = inspector.analyse_label(label, simple_confusables=simple)
+    verdict = inspector.label_verdict(label, simple_confusables=simple)
+    assert verdict.normalized == (result.status == 'normalized')
+    assert verdict.confusable_count == result.confusable_count
+    assert verdict.single_script == (result.all_script is not None)
+    assert verdict.font_support_all_os == result.font_support_all_os
+
+
+def test_label_verdict_safe(inspector):
+    assert inspector.label_verdict('laptop').safe
+    assert not inspector.label_verdict('ąlaptop').safe
+    assert not inspector.label_verdict('Laptop').safe
+    assert not inspector.label_verdict('pаypаl').safe
+
+
+def test_inspector_import_is_lazy():
+    # heavy dependencies and unicode data are loaded on first use
+    script = ('import sys, label_inspector.inspector\n'
+              'from label_inspector.common.myunicode.data import MY_UNICODE_DATA\n'
+              'print([m for m in ("hydra", "omegaconf", "idna", "emoji") if m in sys.modules], '
+              '"_data" in vars(MY_UNICODE_DATA))')
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[] False'
+
+
+def test_font_support_by_os_omitted(inspector):
+    # only the dataset combining all platforms is shipped
+    assert inspector.f.font_support.individual_platforms == []
+    result = inspector.analyse_label('a😀')
+    assert result.font_support_by_os is None
+    data = result.model_dump()
+    assert 'font_support_by_os' not in data
+    assert 'font_support_by_os' not in data['graphemes'][0]
+    assert '"font_support_by_os"' not in result.model_dump_json()
+
+    result.font_support_by_os = {'linux': True}
+    assert result.model_dump()['font_support_by_os'] == {'linux': True}
+
+
+def test_inspector_snapshot(inspector, tmp_path, monkeypatch):
+    path = str(tmp_path / 'inspector.snapshot')
+    inspector.snapshot(path)
+    # from_snapshot preloads the entries, keep them out of other tests
+    monkeypatch.setattr(pickle_cache, '_PRELOADED', {})
+    restored = Inspector.from_snapshot(path)
+    assert restored.config.inspector.fonts == inspector.config.inspector.fonts
+    for label in ['nick', 'аррӏе', 'a‍a', '🅜🅜🅜', 'ǉeto']:
+        assert restored.analyse_label(label) == inspector.analyse_label(label)
+
+
+def test_inspector_snapshot_files(inspector, tmp_path, monkeypatch):
+    path = str(tmp_path / 'inspector.snapshot')
+    inspector.snapshot(path)
+
+    # a fresh environment without cache files, which must not be rebuilt
+    storage = pickle_cache.DirectoryStorage(str(tmp_path / 'cache'))
+    monkeypatch.setattr(pickle_cache, '_STORAGE', storage)
+    monkeypatch.setattr(pickle_cache, '_PRELOADED', {})
+    monkeypatch.setattr(label_inspector.common.myunicode.data, 'write_columns', None)
+    monkeypatch.setattr(Features, '_write_char_types', None)
+
+    restored = Inspector.from_snapshot(path)
+    assert len(restored._cached_files()) == 2
+    for file_path in restored._cached_files():
+        assert os.path.dirname(file_path) == storage.path
+    assert restored.analyse_label('ǉeto') == inspector.analyse_label('ǉeto')
+
+
+def test_inspector_snapshot_invalid(tmp_path):
+    path = tmp_path / 'inspector.snapshot'
+    path.write_bytes(b'not a snapshot')
+    with pytest.raises(SnapshotError):
+        Inspector.from_snapshot(str(path))
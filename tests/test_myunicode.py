@@ -469,6 +469,18 @@ def test_grapheme_iter_hangul(text, graphemes):
     assert myunicode.grapheme.split(text) == graphemes
 
 
+def test_hangul_jamo_block_ranges():
+    from label_inspector.common.myunicode.blocks import block_ranges
+
+    def is_jamo(block):
+        return block.find('Hangul') != -1 and block.find('Jamo') != -1
+
+    ranges = block_ranges(is_jamo)
+    assert (0x1100, 0x1200) in ranges
+    assert {c for start, stop in ranges for c in range(start, stop)} \
+        == {c for c in range(0x110000) if is_jamo(myunicode.block_of(chr(c)) or '')}
+
+
 def test_grapheme_iter_no_hangul():
     with open(os.path.join(TESTS_DATA_PATH, 'primary.csv'), 'r', encoding='utf-8') as f:
         lines = f.readlines()
@@ -517,3 +529,84 @@ def test_emoji_version(emoji, version):
 )
 def test_unicode_min_version(g, version):
     assert myunicode.unicode_min_version(g) == version
+
+
+def test_columns(tmp_path):
+    from label_inspector.common.myunicode.columns import Columns, ColumnsWriter, CharColumn
+
+    writer = ColumnsWriter()
+    writer.add_string_column('name', {0x41: 'LATIN CAPITAL LETTER A', 0x1F600: 'GRINNING FACE', 0x10FFFD: ''})
+    writer.add_column('category', {0x41: 'Lu', 0x61: 'Ll'}, labels=['Ll', 'Lu'])
+    writer.add_column('combining', {0x300: 230, 0x41: 0})
+    path = tmp_path / 'columns'
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+    columns = Columns(str(path))
+    name = columns.column('name')
+    assert name[0x41] == 'LATIN CAPITAL LETTER A'
+    assert name.get(0x1F600) == 'GRINNING FACE'
+    assert name[0x10FFFD] == ''
+    assert name.get(0x42) is None
+    with pytest.raises(KeyError):
+        name[0x110000]
+
+    category = columns.column('category')
+    assert (category[0x41], category[0x61], category.get(0x62, 'Cn')) == ('Lu', 'Ll', 'Cn')
+
+    combining = columns.column('combining')
+    assert (combining[0x300], combining[0x41]) == (230, 0)
+    assert 0x301 not in combining
+
+    chars = CharColumn(category, {'ab': 'Xx'})
+    assert (chars['A'], chars.get('ab'), chars.get('b')) == ('Lu', 'Xx', None)
+
+
+def test_unicode_data_columns():
+    data = myunicode.data.MY_UNICODE_DATA
+    assert data['name'][ord('a')] == 'LATIN SMALL LETTER A'
+    assert data['category'][ord('a')] == 'Ll'
+    assert data['combining'][0x301] == 230
+    assert data['versions']['unicode']['a'] == '1.1'
+    assert 0xE0080 not in data['name']
+
+
+BULK_TEXT = 'vitalikаррӏе🅜łąść한국́‍\U000e0080\U0010fffd' + ''.join(map(chr, range(0x3400, 0x3410)))
+
+
+def expected_bulk(text):
+    def name_or_none(c):
+        try:
+            return myunicode.name(c)
+        except ValueError:
+            return None
+
+    return {
+        'names': [name_or_none(c) for c in text],
+        'categories': [myunicode.category(c) for c in text],
+        'combining_classes': [myunicode.combining(c) for c in text],
+        'scripts': [myunicode.script_of(c) or 'Unknown' for c in text],
+        'blocks': [myunicode.block_of(c) for c in text],
+        'is_emoji_chars': [myunicode.is_emoji_char(c) for c in text],
+        'unicode_versions': [myunicode.unicode_version(c) for c in text],
+    }
+
+
+def test_bulk():
+    from array import array
+    codepoints = array('I', map(ord, BULK_TEXT))
+    for func, expected in expected_bulk(BULK_TEXT).items():
+        assert list(getattr(myunicode.bulk, func)(BULK_TEXT)) == expected, func
+        assert list(getattr(myunicode.bulk, func)(codepoints)) == expected, func
+    assert myunicode.bulk.script_counts('аa1') == {'Cyrillic': 1, 'Latin': 1, 'Common': 1}
+
+
+def test_bulk_numpy():
+    np = pytest.importorskip('numpy')
+    codepoints = np.array(list(map(ord, BULK_TEXT)), dtype=np.uint32)
+    for func, expected in expected_bulk(BULK_TEXT).items():
+        result = getattr(myunicode.bulk, func)(codepoints)
+        assert isinstance(result, np.ndarray)
+        assert result.tolist() == expected, func
+    assert myunicode.bulk.script_counts(codepoints) == myunicode.bulk.script_counts(BULK_TEXT)
+    assert myunicode.bulk.categories(np.array([], dtype=np.uint32)).tolist() == []
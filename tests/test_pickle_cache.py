@@ -0,0 +1,178 @@
+import os
+import re
+
+import pytest
+
+from label_inspector.common import pickle_cache
+from label_inspector.common.pickle_cache import (
+    pickled_property, CacheStorage, DirectoryStorage, PrivateDirectoryStorage, TieredStorage,
+)
+
+
+class Counter:
+    calls = 0
+
+    def __init__(self, config):
+        self.config = config
+
+    @pickled_property('inspector.data')
+    def value(self):
+        Counter.calls += 1
+        with open(self.config['inspector']['data'], encoding='utf-8') as f:
+            return f.read()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(pickle_cache, 'CACHE_DIR', str(cache_dir))
+    monkeypatch.setattr(pickle_cache, 'OVERLAY_DIR', None)
+    monkeypatch.setattr(pickle_cache, 'FALLBACK_DIR', str(tmp_path / 'fallback'))
+    Counter.calls = 0
+    return cache_dir
+
+
+def test_cache_reused(tmp_path, cache_dir):
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+    config = {'inspector': {'data': str(data)}}
+    assert Counter(config).value == 'a'
+    assert Counter(config).value == 'a'
+    assert Counter.calls == 1
+    # no temporary files left behind
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_cache_invalidated_by_file_contents(tmp_path, cache_dir):
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+    config = {'inspector': {'data': str(data)}}
+    assert Counter(config).value == 'a'
+    data.write_text('b')
+    assert Counter(config).value == 'b'
+    assert Counter.calls == 2
+
+
+def test_corrupted_cache_recomputed(tmp_path, cache_dir):
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+    config = {'inspector': {'data': str(data)}}
+    assert Counter(config).value == 'a'
+
+    cache_file, = cache_dir.iterdir()
+    cache_file.write_bytes(cache_file.read_bytes()[:-1])
+    assert Counter(config).value == 'a'
+    assert Counter.calls == 2
+    # the rewritten file is valid
+    assert Counter(config).value == 'a'
+    assert Counter.calls == 2
+
+
+def test_version_changes_cache_name():
+    names = {pickle_cache._cache_name(None, 'name', (), (), version) for version in range(3)}
+    assert len(names) == 3
+
+
+def test_overlay_dir(tmp_path, cache_dir, monkeypatch):
+    overlay = tmp_path / 'overlay'
+    monkeypatch.setattr(pickle_cache, 'OVERLAY_DIR', str(overlay))
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+    assert Counter({'inspector': {'data': str(data)}}).value == 'a'
+    assert len(os.listdir(overlay)) == 1
+    assert not cache_dir.exists()
+
+
+def test_unwritable_cache_dir(tmp_path, cache_dir):
+    # CACHE_DIR cannot be created, new files go to FALLBACK_DIR
+    cache_dir.write_text('')
+    data = tmp_path / 'data.txt'
+    data.write_text('a')
+    config = {'inspector': {'data': str(data)}}
+    assert Counter(config).value == 'a'
+    assert Counter(config).value == 'a'
+    assert Counter.calls == 1
+    assert len(os.listdir(tmp_path / 'fallback')) == 1
+    assert (tmp_path / 'fallback').stat().st_mode & 0o777 == 0o700
+
+
+def test_shared_fallback_dir_not_used(tmp_path):
+    # a directory others can write to may contain planted pickles
+    shared = tmp_path / 'shared'
+    DirectoryStorage(str(shared)).store('entry', 1)
+    shared.chmod(0o777)
+    storage = PrivateDirectoryStorage(str(shared))
+    with pytest.raises(KeyError):
+        storage.load('entry')
+    with pytest.raises(PermissionError):
+        storage.store('entry', 2)
+
+    shared.chmod(0o700)
+    assert storage.load('entry') == 1
+
+
+def test_read_only_tier(tmp_path, cache_dir, monkeypatch):
+    bundled = DirectoryStorage(str(tmp_path / 'bundled'))
+    bundled.store('entry', 1)
+    overlay = DirectoryStorage(str(tmp_path / 'overlay'))
+    storage = TieredStorage([overlay, DirectoryStorage(bundled.path, read_only=True)])
+    assert storage.load('entry') == 1
+    with pytest.raises(KeyError):
+        storage.load('missing')
+
+    storage.store('entry', 2)
+    assert storage.load('entry') == 2
+    assert bundled.load('entry') == 1
+
+    with pytest.raises(PermissionError):
+        TieredStorage([DirectoryStorage(bundled.path, read_only=True)]).store('entry', 3)
+
+
+def test_storage_interface():
+    with pytest.raises(TypeError):
+        CacheStorage()
+    with pytest.raises(ValueError):
+        TieredStorage([])
+
+
+def test_corrupted_file_recreated(tmp_path, cache_dir, monkeypatch):
+    calls = []
+
+    def write(f):
+        calls.append(1)
+        f.write(b'contents')
+
+    path = pickle_cache.cached_file('file', write)
+    assert open(path, 'rb').read() == b'contents'
+    assert os.path.exists(path + pickle_cache.DIGEST_SUFFIX)
+    assert pickle_cache.cached_file('file', write) == path
+    assert len(calls) == 1
+
+    # e.g. a partly copied file
+    with open(path, 'wb') as f:
+        f.write(b'cont')
+    assert pickle_cache.cached_file('file', write) == path
+    assert open(path, 'rb').read() == b'contents'
+    assert len(calls) == 2
+
+    # in a new process, a file without a digest is not trusted either
+    os.remove(path + pickle_cache.DIGEST_SUFFIX)
+    monkeypatch.setattr(pickle_cache, '_VERIFIED_FILES', set())
+    pickle_cache.cached_file('file', write)
+    assert len(calls) == 3
+
+
+def _locked_version(package: str) -> str:
+    lock = os.path.join(os.path.dirname(__file__), '..', 'poetry.lock')
+    with open(lock, encoding='utf-8') as f:
+        return re.search(rf'^name = "{package}"\nversion = "([^"]+)"$', f.read(), re.MULTILINE).group(1)
+
+
+def test_bundled_char_types_match_lock():
+    # the bundled table is only used with the regex release pinned in poetry.lock
+    from label_inspector.components.features import CHAR_TYPES_NAME, CHAR_TYPES_VERSION
+
+    version = (CHAR_TYPES_VERSION, _locked_version('regex'))
+    file_name = f'{CHAR_TYPES_NAME}-{pickle_cache._hash_deps(None, (), (), version)}'
+    storage = DirectoryStorage(pickle_cache.CACHE_DIR, read_only=True)
+    assert storage.file_path(file_name)
@@ -1,5 +1,8 @@
+import os
+import random
 import pytest
-from label_inspector.common.punycode import puny_analysis, puny_encoded
+from label_inspector.common.punycode import puny_analysis, puny_analysis_batch, puny_encoded, is_rfc1123, punycode_encode
+from helpers import TESTS_DATA_PATH
 
 
 @pytest.mark.parametrize('name, expected', [
@@ -51,8 +54,39 @@ def test_puny_compatibility():
 ])
 def test_dns_support(name, expected):
     assert puny_analysis(name).dns_support == expected
+    assert is_rfc1123(name) == expected
 
 
 def test_punycode_error_prio():
     # not NAME_TOO_LONG
     assert puny_analysis('x' * 1024).compatibility.name == 'LABEL_TOO_LONG'
+
+
+def test_puny_analysis_batch():
+    names = ['ąą.eth', 'x' * 64, 'ąą.eth', 'K.com', 'a.' * 127, '']
+    assert puny_analysis_batch(iter(names)) == [puny_analysis(name) for name in names]
+    # KELVIN SIGN is lowercased to ASCII
+    assert puny_analysis('K.com').dns_support
+
+
+def test_punycode_encode():
+    labels = []
+    for filename in sorted(os.listdir(TESTS_DATA_PATH)):
+        with open(os.path.join(TESTS_DATA_PATH, filename), encoding='utf-8') as f:
+            labels.extend(line.rstrip('\n') for line in f)
+    rng = random.Random(0)
+    for _ in range(1000):
+        labels.append(''.join(chr(rng.randrange(0x110000 if rng.random() < 0.5 else 0x100))
+                              for _ in range(rng.randint(0, 30))))
+
+    for label in labels:
+        expected = label.encode('punycode').decode('ascii')
+        assert punycode_encode(label) == expected
+        assert punycode_encode([ord(c) for c in label]) == expected
+        for max_length in [0, 10, len(expected) - 1, len(expected)]:
+            assert punycode_encode(label, max_length) == (expected if len(expected) <= max_length else None)
+
+
+def test_punycode_label_too_long_early():
+    assert puny_analysis('😀' * 1000).compatibility.name == 'LABEL_TOO_LONG'
+    assert puny_analysis('a_' + '😀' * 1000).compatibility.name == 'UNSUPPORTED_ASCII'
@@ -0,0 +1,32 @@
+import pytest
+
+from label_inspector.common.regex_registry import RegexRegistry, ascii_chars_check
+
+
+def test_regex_registry_lazy():
+    registry = RegexRegistry({'digits': r'^\d+$', 'letters': r'^\p{L}+$'})
+    assert registry.timings == {}
+    assert registry.digits.match('123')
+    assert list(registry.timings) == ['digits']
+    # compiled once, then a plain attribute
+    assert registry['digits'] is registry.digits
+    assert 'digits' in vars(registry)
+    with pytest.raises(AttributeError):
+        registry.missing
+    with pytest.raises(KeyError):
+        registry['missing']
+
+
+def test_regex_registry_eager():
+    registry = RegexRegistry({'digits': r'^\d+$', 'letters': r'^\p{L}+$'}, lazy=False)
+    assert sorted(registry.timings) == ['digits', 'letters']
+    assert registry.letters.match('ąb')
+
+
+def test_ascii_chars_check():
+    check = ascii_chars_check('abc-')
+    assert check('a-b')
+    assert not check('')
+    assert not check('abd')
+    assert not check('ą')
+    assert not check('abc\n')
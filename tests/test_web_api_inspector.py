@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 import label_inspector.web_api as web_api_inspector
+from label_inspector.common.columnar import from_columns
 
 from helpers import check_inspector_response
 
@@ -53,6 +54,41 @@ def test_inspector_cured_label(test_test_client):
     resp = response.json()
     check_inspector_response(label, resp)
     assert resp['cured_label'] == None
+    assert resp['cure_status'] == 'UNCURABLE'
+
+
+def test_inspector_cure_budget(test_test_client):
+    label = '⎛⎝⎞⎠' * 100
+    response = test_test_client.post('/', json={'label': label, 'cure_max_iterations': 3})
+    assert response.status_code == 200
+    resp = response.json()
+    check_inspector_response(label, resp)
+    assert resp['cured_label'] is None
+    assert resp['cure_status'] == 'ITERATION_LIMIT'
+
+    response = test_test_client.post('/', json={'label': 'my name', 'omit_cure': True})
+    assert response.status_code == 200
+    resp = response.json()
+    assert resp['cured_label'] is None
+    assert resp['cure_status'] == 'OMITTED'
+
+
+def test_inspector_analysis_tier(test_test_client):
+    label = 'ą' * 600
+    response = test_test_client.post('/', json={'label': label})
+    assert response.status_code == 200
+    resp = response.json()
+    check_inspector_response(label, resp)
+    assert resp['analysis_tier'] == 'summary'
+    assert resp['confusable_count'] == 600
+
+    label = 'a' * 600
+    response = test_test_client.post('/', json={'label': label, 'long_label': None, 'long_label_graphemes': None})
+    assert response.status_code == 200
+    resp = response.json()
+    check_inspector_response(label, resp)
+    assert resp['analysis_tier'] == 'full'
+    assert len(resp['graphemes']) == 600
 
 
 def test_inspector_batch(test_test_client):
@@ -63,3 +99,126 @@ def test_inspector_batch(test_test_client):
     assert len(resp['results']) == len(labels)
     for label, result in zip(labels, resp['results']):
         check_inspector_response(label, result)
+
+
+def test_inspector_name(test_test_client):
+    response = test_test_client.post('/name', json={'name': 'my name.eth'})
+    assert response.status_code == 200
+    resp = response.json()
+    assert resp['name'] == 'my name.eth'
+    assert resp['status'] == 'unnormalized'
+    assert resp['label_count'] == 2
+    check_inspector_response('my name', resp['labels'][0])
+    check_inspector_response('eth', resp['labels'][1])
+    assert resp['labels'][0]['cured_label'] == 'myname'
+
+
+def test_inspector_name_batch(test_test_client):
+    names = ['cat.eth', 'dog.eth', 'cat']
+    response = test_test_client.post('/name/batch', json={'names': names})
+    assert response.status_code == 200
+    resp = response.json()
+    assert [result['name'] for result in resp['results']] == names
+    for name, result in zip(names, resp['results']):
+        for label, label_result in zip(name.split('.'), result['labels']):
+            check_inspector_response(label, label_result)
+
+
+def test_inspector_confusable_risk(test_test_client):
+    response = test_test_client.post('/confusable-risk', json={'label': 'ąlaptop'})
+    assert response.status_code == 200
+    resp = response.json()
+    assert resp['label'] == 'ąlaptop'
+    assert resp['confusable_count'] == 1
+    assert resp['canonical_exists'] is True
+    assert resp['mixed_script'] is False
+    assert resp['exceeded'] is False
+
+    response = test_test_client.post('/confusable-risk', json={'label': 'pаypаl', 'threshold': 0})
+    assert response.status_code == 200
+    assert response.json()['exceeded'] is True
+
+
+def test_inspector_safe(test_test_client):
+    response = test_test_client.post('/safe', json={'label': 'ąlaptop'})
+    assert response.status_code == 200
+    assert response.json() == {
+        'label': 'ąlaptop',
+        'safe': False,
+        'normalized': True,
+        'confusable_count': 1,
+        'single_script': True,
+        'font_support_all_os': True,
+    }
+
+
+def test_inspector_safe_batch(test_test_client):
+    labels = ['laptop', 'Laptop', 'pаypаl']
+    response = test_test_client.post('/safe/batch', json={'labels': labels})
+    assert response.status_code == 200
+    resp = response.json()
+    assert resp['labels'] == labels
+    assert resp['safe'] == [True, False, False]
+    assert resp['normalized'] == [True, False, False]
+    assert resp['single_script'] == [True, True, False]
+    assert len(resp['confusable_count']) == len(resp['font_support_all_os']) == 3
+
+    response = test_test_client.post('/safe/batch', json={'labels': []})
+    assert response.status_code == 200
+    assert response.json()['safe'] == []
+
+
+def test_inspector_batch_columnar(test_test_client):
+    labels = ['laptop', 'ąlaptop', 'Laptop', '']
+    expected = test_test_client.post('/batch', json={'labels': labels}).json()['results']
+
+    response = test_test_client.post('/batch', json={'labels': labels},
+                                     headers={'Accept': web_api_inspector.COLUMNAR_JSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == web_api_inspector.COLUMNAR_JSON_MEDIA_TYPE
+    assert from_columns(response.json()) == expected
+
+    response = test_test_client.post('/name/batch', json={'names': ['nick.eth']},
+                                     headers={'Accept': web_api_inspector.COLUMNAR_JSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert from_columns(response.json())[0]['name'] == 'nick.eth'
+
+
+def test_inspector_batch_msgpack(test_test_client):
+    msgpack = pytest.importorskip('msgpack')
+    labels = ['laptop', 'ąlaptop']
+    expected = test_test_client.post('/batch', json={'labels': labels}).json()
+
+    response = test_test_client.post('/batch', json={'labels': labels},
+                                     headers={'Accept': web_api_inspector.MSGPACK_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert msgpack.unpackb(response.content) == expected
+
+    response = test_test_client.post('/batch', json={'labels': labels},
+                                     headers={'Accept': web_api_inspector.COLUMNAR_MSGPACK_MEDIA_TYPE})
+    assert from_columns(msgpack.unpackb(response.content)) == expected['results']
+
+    accept = 'application/json;q=0, application/*'
+    assert web_api_inspector.negotiate_media_type(accept, web_api_inspector.BATCH_MEDIA_TYPES) == 'application/msgpack'
+
+
+def test_inspector_batch_not_acceptable(test_test_client):
+    response = test_test_client.post('/batch', json={'labels': ['laptop']}, headers={'Accept': 'text/html'})
+    assert response.status_code == 406
+    response = test_test_client.post('/safe/batch', json={'labels': ['laptop']},
+                                     headers={'Accept': web_api_inspector.COLUMNAR_JSON_MEDIA_TYPE})
+    assert response.status_code == 406
+
+
+@pytest.mark.parametrize('accept,media_type', [
+    (None, 'application/json'),
+    ('*/*', 'application/json'),
+    ('text/html, */*;q=0.8', 'application/json'),
+    ('application/vnd.namehash.columnar+json, application/json;q=0.5', 'application/vnd.namehash.columnar+json'),
+    ('application/json;q=0, application/*', 'application/vnd.namehash.columnar+json'),
+    ('text/html', None),
+])
+def test_negotiate_media_type(accept, media_type, monkeypatch):
+    # MessagePack media types are not offered without msgpack
+    monkeypatch.setattr(web_api_inspector, 'msgpack', None)
+    assert web_api_inspector.negotiate_media_type(accept, web_api_inspector.BATCH_MEDIA_TYPES) == media_type